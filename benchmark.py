@@ -0,0 +1,227 @@
+"""
+Banc d'essai reproductible de main10.py : génération, recherche de chemins et affichage.
+
+Pour chaque taille de grille, la carte de base est générée avec une graine fixe puis sauvegardée :
+chaque opération est mesurée sur une copie fraîche de cette carte, pour que les résultats ne dépendent
+pas de l'ordre des mesures. La table de voisinage, partagée par toutes les grilles d'une même taille,
+est construite avant les mesures, et les tableaux de coûts des recherches de chemin le sont dans l'étape
+de préparation (non mesurée) de chaque mode de find_path_smart. On relève le temps (meilleur de --repeat exécutions), le pic mémoire
+(tracemalloc, lors d'une exécution séparée) et le nombre de cases développées par les recherches.
+
+Exécution :
+    python benchmark.py                                  # tailles 33, 129, 513 et 2049
+    python benchmark.py --sizes 33 129 --output avant.json
+    python benchmark.py --sizes 33 129 --compare avant.json
+
+Auteur : Colin Rousseau & Gaspard Vieujean
+"""
+
+from __future__ import annotations
+
+#Affichage sans fenêtre : à choisir avant d'importer pyplot
+import matplotlib
+matplotlib.use("Agg")
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from main10 import HexGridViewer, get_hex_adjacency
+
+DEFAULT_SIZES = [33, 129, 513, 2049]
+
+
+def _show_headless(grid: HexGridViewer) -> None:
+    """Affiche la grille puis force le rendu de la figure (Agg), sans ouvrir de fenêtre."""
+    grid.show()
+    plt.gcf().canvas.draw()
+    plt.close("all")
+
+
+def operations(size: int, seed: int, nb_cities: int, base: HexGridViewer) -> Dict[str, Callable[[HexGridViewer], int | None]]:
+    """
+    Retourne les opérations mesurées, chacune appliquée à une copie de la carte de base.
+    Une opération renvoie le nombre de cases développées quand il a un sens, None sinon.
+    Une opération peut aussi être un couple (préparation, opération) : la préparation n'est pas mesurée.
+    """
+    #Deux cases terrestres fixes pour les recherches de chemin
+    land = [c for c in base.get_all_coords() if base.get_terrain(*c) != "eau" and base.get_color(*c) != "dodgerblue"]
+    start, goal = random.Random(seed).sample(land, 2)
+    center = (size - 1) // 2
+
+    def generate_map(grid):
+        grid.generate_map(seed=seed)
+
+    def generate_terrain(grid):
+        grid.generate_terrain(grid.get_altitude_layer().ravel())
+
+    def bfs(grid):
+        return sum(len(cells) for cells in grid.bfs(center, center, size // 4).values())
+
+    def find_path_smart(mode):
+        def run(grid):
+            grid.find_path_smart(start, goal, mode=mode)
+            return grid.get_nodes_expanded()
+        return run
+
+    def prepare_routing(grid):
+        #Tableaux de coûts des recherches (cache par version de carte) : construits hors mesure pour tous les modes
+        grid._routing_arrays()
+
+    def place_cities_and_compare_roads(grid):
+        random.seed(seed)
+        grid.place_cities_and_compare_roads(nb_cities)
+
+    def generate_merchant_tour(grid):
+        random.seed(seed)
+        grid.generate_merchant_tour(nb_cities)
+
+    return {
+        "generate_map": generate_map,
+        "high_points_fixation": lambda grid: grid.high_points_fixation(),
+        "generate_terrain": generate_terrain,
+        "bfs": bfs,
+        "find_path_bfs": lambda grid: grid.find_path_bfs(start, goal) and None,
+        "find_path_smart": (prepare_routing, find_path_smart("dijkstra")),
+        "find_path_smart[astar]": (prepare_routing, find_path_smart("astar")),
+        "build_landmarks": lambda grid: grid.build_landmarks(8, seed=seed) and None,
+        "find_path_smart[alt]": (lambda grid: grid.build_landmarks(8, seed=seed), find_path_smart("alt")),
+        "find_path_smart[dial]": (lambda grid: grid.find_path_smart(start, start, mode="dial"), find_path_smart("dial")),
+        "place_cities_and_compare_roads": place_cities_and_compare_roads,
+        "generate_merchant_tour": generate_merchant_tour,
+        "show": _show_headless,
+    }
+
+
+def run_benchmarks(sizes: List[int], seed: int, nb_cities: int, repeat: int, memory: bool, only: List[str] | None) -> List[dict]:
+    """Mesure chaque opération sur chaque taille et retourne la liste des résultats."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"map_{size}.hexmap")
+            base = HexGridViewer(size, size)
+            base.generate_map(seed=seed)
+            base.save(path)
+            _check_round_trip(base, path)
+            #Table de voisinage (cache global par taille) : construite ici, hors de toute mesure
+            get_hex_adjacency(size, size).get_lists()
+
+            for name, operation in operations(size, seed, nb_cities, base).items():
+                if only and name not in only:
+                    continue
+
+                prepare = None
+                if isinstance(operation, tuple):
+                    prepare, operation = operation
+
+                seconds = float("inf")
+                nodes = None
+                for _ in range(repeat):
+                    grid = HexGridViewer.load(path, mmap=False)
+                    if prepare is not None:
+                        prepare(grid)
+                    t0 = time.perf_counter()
+                    nodes = operation(grid)
+                    seconds = min(seconds, time.perf_counter() - t0)
+
+                peak = None
+                if memory:
+                    grid = HexGridViewer.load(path, mmap=False)
+                    if prepare is not None:
+                        prepare(grid)
+                    tracemalloc.start()
+                    operation(grid)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                result = {"size": size, "operation": name, "seconds": seconds, "peak_bytes": peak, "nodes_expanded": nodes}
+                results.append(result)
+                print(f"{size:>6} {name:<32} {seconds:>10.4f} s {_format_bytes(peak):>10} "
+                      f"{'' if nodes is None else nodes:>10}", file=sys.stderr, flush=True)
+    return results
+
+
+def _check_round_trip(grid: HexGridViewer, path: str) -> None:
+    """Vérifie que la carte relue (avec et sans projection en mémoire) est identique à celle sauvegardée."""
+    for mmap in (True, False):
+        loaded = HexGridViewer.load(path, mmap=mmap)
+        for layer in ("get_altitude_layer", "get_terrain_layer", "get_alpha_layer", "get_color_layer"):
+            assert np.array_equal(getattr(loaded, layer)(), getattr(grid, layer)()), f"{path}: {layer} differs after load"
+        assert loaded.get_palette() == grid.get_palette(), f"{path}: palette differs after load"
+
+
+def _format_bytes(n: int | None) -> str:
+    """Taille lisible (Mo) ou chaîne vide."""
+    return "" if n is None else f"{n / 2**20:.1f} Mo"
+
+
+def _git_revision() -> str | None:
+    """Commit courant du dépôt, pour pouvoir comparer les résultats entre commits."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous: dict, current: dict) -> None:
+    """Affiche le rapport de temps (actuel / précédent) pour chaque mesure commune aux deux fichiers."""
+    before = {(r["size"], r["operation"]): r for r in previous["results"]}
+    print(f"Comparaison avec {previous.get('revision')}", file=sys.stderr)
+    for r in current["results"]:
+        old = before.get((r["size"], r["operation"]))
+        if old is None or not old["seconds"]:
+            continue
+        print(f"{r['size']:>6} {r['operation']:<32} {old['seconds']:>10.4f} s -> {r['seconds']:>10.4f} s "
+              f"(x{r['seconds'] / old['seconds']:.2f})", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="côtés des grilles testées")
+    parser.add_argument("--seed", type=int, default=0, help="graine de la carte et des villes")
+    parser.add_argument("--cities", type=int, default=6, help="nombre de villes (routes et tour du marchand)")
+    parser.add_argument("--repeat", type=int, default=1, help="nombre d'exécutions chronométrées (on garde la meilleure)")
+    parser.add_argument("--no-memory", action="store_true", help="ne pas mesurer le pic mémoire")
+    parser.add_argument("--only", nargs="+", help="ne mesurer que ces opérations")
+    parser.add_argument("--output", help="fichier JSON de sortie (par défaut : sortie standard)")
+    parser.add_argument("--compare", help="fichier JSON d'une exécution précédente à comparer")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.seed, args.cities, args.repeat, not args.no_memory, args.only)
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "seed": args.seed,
+        "cities": args.cities,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+#Eviter d'éxécuter tout le code de la page si le fichier est importer
+if __name__ == "__main__":
+    main()
@@ -24,7 +24,7 @@ from collections import defaultdict
 import random
 
 #Importations basiques de python pour inclure dictionnaire, tuples, et des listes
-from typing import Dict, Tuple, List
+from typing import Callable, Dict, Tuple, List
 
 #Visualisation de données / dessins / graphiques
 import matplotlib.pyplot as plt
@@ -32,8 +32,8 @@ import matplotlib.pyplot as plt
 #Importations des couleurs avec une précision
 import matplotlib.colors as mcolors
 
-#Importations de polygones réguliers
-from matplotlib.patches import RegularPolygon
+#Collections : un seul objet matplotlib pour tous les hexagones, symboles ou liens
+from matplotlib.collections import PolyCollection, LineCollection, PatchCollection
 
 #Gère propriétés de style par rapport aux formes
 from matplotlib.patches import Patch
@@ -53,6 +53,16 @@ import time
 #File a priorité
 import heapq
 
+#Mise en cache des tables de voisinage par taille de grille
+from functools import lru_cache
+
+#Tableaux compacts de flottants à accès scalaire rapide (distances des repères ALT)
+from array import array
+
+#Sauvegarde des cartes : en-tête JSON + tableaux binaires bruts
+import json
+import struct
+
 # un simple alias de typage python : type (x,y)
 Coords = Tuple[int, int]  
 
@@ -99,6 +109,262 @@ class Circle(Forme):
         return plt.Circle((x, y), h / 2, facecolor=self._color, edgecolor=self._edgecolor)
 
 
+# Décalages (dx, dy) des 6 voisins selon la parité de la ligne, dans l'ordre de get_neighbours
+EVEN_ROW_OFFSETS = ((1, 0), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1))
+ODD_ROW_OFFSETS = ((1, 0), (1, 1), (0, 1), (-1, 0), (0, -1), (1, -1))
+
+
+class HexAdjacency:
+    """
+    Table de voisinage précalculée d'une grille hexagonale de taille donnée.
+    Les cases sont identifiées par un entier : id = y * largeur + x (ordre des couches [y, x] aplaties).
+
+    - table : tableau (N, 6) int32 des voisins de chaque case, complété par -1 hors de la grille
+      (largeur fixe : les parcours vectorisés l'indexent directement, sans tableau d'offsets)
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.size = width * height
+
+        xs, ys = np.meshgrid(np.arange(width), np.arange(height))
+        odd = (ys % 2 == 1)
+        table = np.full((height, width, 6), -1, dtype=np.int32)
+        for k, ((dx_even, dy_even), (dx_odd, dy_odd)) in enumerate(zip(EVEN_ROW_OFFSETS, ODD_ROW_OFFSETS)):
+            nx = xs + np.where(odd, dx_odd, dx_even)
+            ny = ys + np.where(odd, dy_odd, dy_even)
+            inside = (0 <= nx) & (nx < width) & (0 <= ny) & (ny < height)
+            table[..., k] = np.where(inside, ny * width + nx, -1)
+        self.table = table.reshape(self.size, 6)
+        self.table.setflags(write=False)
+
+        self.__lists = None
+
+    def get_lists(self) -> List[Tuple[int, ...]]:
+        """Retourne les voisins de chaque case sous forme de tuples python (pour les boucles scalaires)."""
+        if self.__lists is None:
+            self.__lists = [tuple(n for n in row if n >= 0) for row in self.table.tolist()]
+        return self.__lists
+
+
+# Types de terrain, stockés dans la grille sous forme de codes uint8 (indice dans TERRAIN_NAMES).
+# Les tables ci-dessous donnent, pour chaque code, la couleur d'affichage, le coût de base pour entrer
+# dans la case (voir get_movement_cost) et si la case est franchissable par les recherches de chemin.
+TERRAIN_NAMES = ("inconnu", "eau", "sable", "herbe", "foret", "montagne")
+TERRAIN_CODES = {name: code for code, name in enumerate(TERRAIN_NAMES)}
+TERRAIN_COLORS = (None, "dodgerblue", "sandybrown", "lightgreen", "darkgreen", "lightgray")
+TERRAIN_COSTS = np.array([1.0, 1.0, 1.0, 2.0, 5.0, 10.0])
+TERRAIN_PASSABLE = np.array([True, False, True, True, True, True])
+WATER = TERRAIN_CODES["eau"]
+
+
+# Format binaire des cartes sauvegardées :
+#   MAP_MAGIC (8 octets) | version (uint32) | taille de l'en-tête (uint32) | en-tête JSON
+#   | tableaux bruts (ordre C, petit-boutiste), chacun aligné sur MAP_ALIGNMENT octets
+# L'en-tête décrit la palette, les symboles, les liens et la position de chaque tableau,
+# ce qui permet de projeter les couches en mémoire (np.memmap) sans rien analyser.
+MAP_MAGIC = b"HEXMAP\x00\x00"
+MAP_FORMAT_VERSION = 1
+MAP_ALIGNMENT = 64
+
+
+class DisjointSet:
+    """
+    Union-Find sur des identifiants entiers 0..size-1 (villes, cases, ...), stocké dans deux listes.
+    Union par rang et recherche itérative avec division de chemin (path halving) : pas de récursion,
+    coût quasi constant même sur des millions d'éléments.
+    """
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+        # nombre d'ensembles disjoints restants
+        self.count = size
+
+    def find(self, i: int) -> int:
+        """Trouve le représentant (racine) de l'ensemble contenant i."""
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> bool:
+        """Réunit les ensembles de i et j ; retourne False s'ils étaient déjà réunis."""
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return False
+        if self.rank[root_i] < self.rank[root_j]:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        if self.rank[root_i] == self.rank[root_j]:
+            self.rank[root_i] += 1
+        self.count -= 1
+        return True
+
+
+@lru_cache(maxsize=None)
+def get_hex_adjacency(width: int, height: int) -> HexAdjacency:
+    """Construit (une seule fois par taille de grille) la table de voisinage hexagonale."""
+    return HexAdjacency(width, height)
+
+
+def tour_cost(matrix: np.ndarray, tour: List[int]) -> float:
+    """Coût d'une tournée fermée (liste d'indices de villes) dans une matrice de coûts."""
+    return float(sum(matrix[tour[k], tour[(k + 1) % len(tour)]] for k in range(len(tour))))
+
+
+def optimize_tour(matrix: np.ndarray, tour: List[int], time_budget: float = 1.0, max_moves: int = None,
+                  nb_neighbours: int = 8) -> Tuple[List[int], float, float]:
+    """
+    Améliore une tournée fermée par recherche locale 2-opt et Or-opt (déplacement de 1 à 3 villes consécutives).
+
+    Seuls les nb_neighbours plus proches voisins de chaque ville sont essayés, et une ville dont le voisinage
+    n'a rien donné n'est réexaminée que si une de ses arêtes change ("don't look bits"). La recherche s'arrête
+    sur un optimum local, après time_budget secondes ou après max_moves améliorations.
+
+    Les coûts de la grille vérifient cout(a, b) + base(a) = cout(b, a) + base(b) : le coût d'une tournée fermée ne
+    dépend pas du sens de parcours, on peut donc travailler sur la matrice symétrisée (m + mᵀ) / 2.
+    Toutes les villes doivent être accessibles entre elles. La première ville de `tour` reste en tête.
+    Retourne la tournée améliorée, son coût avant et après.
+    """
+    n = len(tour)
+    before = tour_cost(matrix, tour)
+    if n < 4:
+        return list(tour), before, before
+
+    sym = (matrix + matrix.T) / 2
+    dist = sym.tolist()
+    np.fill_diagonal(sym, np.inf)
+    neighbours = np.argsort(sym, axis=1)[:, :min(nb_neighbours, n - 1)].tolist()
+
+    tour = list(tour)
+    first = tour[0]
+    pos = [0] * len(matrix)
+    for i, city in enumerate(tour):
+        pos[city] = i
+    active = deque(tour)
+    queued = set(tour)
+    deadline = time.perf_counter() + time_budget
+    moves = 0
+    eps = 1e-9
+
+    def succ(city: int) -> int:
+        return tour[(pos[city] + 1) % n]
+
+    def pred(city: int) -> int:
+        return tour[pos[city] - 1]
+
+    def rebuild(new_tour: List[int], touched) -> None:
+        """Remplace la tournée et réactive les villes dont une arête a changé."""
+        tour[:] = new_tour
+        for i, city in enumerate(tour):
+            pos[city] = i
+        for city in touched:
+            if city not in queued:
+                queued.add(city)
+                active.append(city)
+
+    def two_opt(a: int, c: int) -> bool:
+        """Remplace les arêtes (a, succ a) et (c, succ c) par (a, c) et (succ a, succ c) si c'est rentable."""
+        b, d = succ(a), succ(c)
+        if c in (a, b) or d == a:
+            return False
+        if dist[a][c] + dist[b][d] - dist[a][b] - dist[c][d] < -eps:
+            #On inverse le segment b..c
+            rotated = tour[pos[b]:] + tour[:pos[b]]
+            j = rotated.index(c)
+            rebuild(rotated[:j + 1][::-1] + rotated[j + 1:], (a, b, c, d))
+            return True
+        return False
+
+    def or_opt(a: int, c: int) -> bool:
+        """Déplace un segment de 1 à 3 villes commençant en `a` à côté de `c`, éventuellement retourné."""
+        for length in (1, 2, 3):
+            rotated = tour[pos[a]:] + tour[:pos[a]]
+            segment, rest = rotated[:length], rotated[length:]
+            if c in segment or len(rest) < 2:
+                return False
+            e, p, q = segment[-1], rest[-1], rest[0]
+            removed = dist[p][a] + dist[e][q] - dist[p][q]
+            i = rest.index(c)
+            after, before_c = rest[(i + 1) % len(rest)], rest[i - 1]
+            #c, a..e, succ(c)  ou  pred(c), e..a, c
+            if dist[c][a] + dist[e][after] - dist[c][after] < removed - eps:
+                rebuild(rest[:i + 1] + segment + rest[i + 1:], (a, e, p, q, c, after))
+                return True
+            if dist[before_c][e] + dist[a][c] - dist[before_c][c] < removed - eps:
+                rebuild(rest[:i] + segment[::-1] + rest[i:], (a, e, p, q, c, before_c))
+                return True
+        return False
+
+    while active and time.perf_counter() < deadline and (max_moves is None or moves < max_moves):
+        a = active.popleft()
+        queued.discard(a)
+        for c in neighbours[a]:
+            if two_opt(a, c) or two_opt(pred(a), pred(c)) or or_opt(a, c):
+                moves += 1
+                if a not in queued:
+                    queued.add(a)
+                    active.append(a)
+                break
+
+    i = tour.index(first)
+    tour = tour[i:] + tour[:i]
+    return tour, before, tour_cost(matrix, tour)
+
+
+def solve_tour_exact(matrix: np.ndarray) -> Tuple[List[int], float]:
+    """
+    Tournée fermée optimale partant de la ville 0 (Held-Karp), (liste d'indices, coût) ; coût inf si une ville
+    est inaccessible.
+
+    best[mask, j] est le coût minimal pour partir de la ville 0, visiter les villes de `mask` (bit j-1 pour la
+    ville j) et finir en j. Les masques sont traités couche par couche (même nombre de villes) : chaque couche
+    est une opération NumPy par ville d'arrivée, sans boucle Python sur les masques.
+    Mémoire : 2^(n-1) * (n-1) * 9 octets (pic mesuré : 5 Mo pour 16 villes, 110 Mo pour 20), à limiter par l'appelant.
+    """
+    n = len(matrix)
+    if n <= 2:
+        tour = list(range(n))
+        return tour, tour_cost(matrix, tour) if n else 0.0
+    m = n - 1
+    cost = np.asarray(matrix, dtype=np.float64)[1:, 1:]
+
+    masks = np.arange(1 << m)
+    layers = np.zeros(1 << m, dtype=np.uint8)
+    for j in range(m):
+        layers += ((masks >> j) & 1).astype(np.uint8)
+    best = np.full((1 << m, m), np.inf)
+    parent = np.full((1 << m, m), -1, dtype=np.int8)
+    best[1 << np.arange(m), np.arange(m)] = matrix[0, 1:]
+
+    for size in range(2, m + 1):
+        layer = masks[layers == size]
+        for j in range(m):
+            selected = layer[((layer >> j) & 1) == 1]
+            #Arrivée en j depuis la meilleure ville i du masque sans j (best vaut inf si i n'y est pas)
+            candidates = best[selected ^ (1 << j)] + cost[:, j]
+            previous = candidates.argmin(axis=1)
+            best[selected, j] = candidates[np.arange(len(selected)), previous]
+            parent[selected, j] = previous
+
+    full = (1 << m) - 1
+    total = best[full] + matrix[1:, 0]
+    last = int(total.argmin())
+    if not np.isfinite(total[last]):
+        return [], float("inf")
+
+    #On remonte les parents depuis la dernière ville
+    tour = []
+    mask = full
+    while last >= 0:
+        tour.append(last + 1)
+        mask, last = mask ^ (1 << last), int(parent[mask, last])
+    return [0] + tour[::-1], float(total.min())
+
+
 class HexGridViewer:
     """
     Classe permettant d'afficher une grille hexagonale. Elle se crée via son constructeur avec deux arguments:
@@ -106,7 +372,9 @@ class HexGridViewer:
     Deux attributs gèrent l'apparence des hexagones: colors et alpha, pour respectivement représenter la
     couleur et la transparence des hexagones.
     Chaque hexagone est représenté par une tuple : (x, y) spécifique dans la grille. 
-    Ces tuples sont les clés des dictionnaires colors et alpha, que vous pouvez modifier via les méthodes add_color et add_alpha.
+    Les couches (altitude, terrain, couleur, alpha) sont des tableaux numpy de forme (hauteur, largeur)
+    indexés par [y, x], que vous pouvez modifier via les méthodes add_color, add_alpha, etc.
+    ou manipuler directement pour du code vectorisé via get_altitude_layer, get_color_layer, etc.
 
     Il est aussi possible d'ajouter des symboles Rectangle ou Circle au milieu des hexagones, ainsi que des liens
     entre les centres des hexagones.
@@ -124,27 +392,48 @@ class HexGridViewer:
         # mais est nécessaire pour calculer les points
         self.__hexsize = 10
 
+        # Les couches de la carte sont stockées en "structure de tableaux" : un tableau numpy
+        # de forme (hauteur, largeur) par couche, indexé par [y, x]. Cela évite un dictionnaire
+        # de tuples (x, y) par couche, très coûteux en mémoire sur les grandes cartes.
+
         # couleur des hexagones : par défaut, blanc
-        #Lorsqu'on accède à une coordonnée qui n'a pas de couleur affecté, ce sera blanc
-        self.__colors: Dict[Coords, str] = defaultdict(lambda: "white")
+        # Les couleurs sont stockées sous forme de codes (uint16) vers une palette de noms matplotlib
+        self.__palette: List[str] = ["white"]
+        self.__palette_index: Dict[str, int] = {"white": 0}
+        self.__colors = np.zeros((height, width), dtype=np.uint16)
 
         # transparence des hexagones : par défaut, 1
         #De même que les couleurs
-        self.__alpha: Dict[Coords, float] = defaultdict(lambda: 1)
+        self.__alpha = np.ones((height, width), dtype=np.float64)
 
         # symboles sur les hexagones, par défaut, aucun symbole sur une case.
         # Limitation : un seul symbole par case !
-        #Le symbole est soit une forme ou soit None
+        #Le symbole est soit une forme ou soit None (peu de cases en ont, un dictionnaire suffit)
         self.__symbols: Dict[Coords, Forme | None] = defaultdict(lambda: None)
 
         # liste de liens à affichager entre les cases.
         self.__links: List[Tuple[Coords, Coords, str, int]] = []
 
         #Altitudes du terrain
-        self.__altitude: Dict[Coords, float] = defaultdict(lambda: 0)
-
-        #Types de terrain
-        self.__terrain: Dict[Coords, str] = defaultdict(lambda: "inconnu")
+        self.__altitude = np.zeros((height, width), dtype=np.float64)
+
+        #Types de terrain (codes uint8, voir TERRAIN_NAMES)
+        self.__terrain = np.zeros((height, width), dtype=np.uint8)
+
+        #Nombre de cases développées par la dernière recherche de chemin
+        self.__nodes_expanded = 0
+
+        #Version de la carte : incrémentée à chaque modification des altitudes, terrains ou couleurs,
+        #elle invalide les données précalculées pour les recherches de chemin
+        self.__version = 0
+        self.__routing = None
+        self.__landmarks = None
+        #Trajets entre villes déjà calculés (voir city_distance_matrix)
+        self.__city_routes = None
+        #Champs de directions déjà calculés, par case d'arrivée (voir flow_field)
+        self.__flow_fields = None
+        #Arcs aux coûts arrondis pour le mode "dial" (voir _quantized_arcs)
+        self.__quantized = None
 
     def get_width(self) -> int:
         """Retourne la largeur (nombre de colonnes)."""
@@ -157,15 +446,28 @@ class HexGridViewer:
 
     def add_color(self, x: int, y: int, color: str) -> None:
         """Ajoute une couleur à la coordonnée (x, y) en vérifiant qu'elle est valide."""
+        self.__colors[y, x] = self.get_color_code(color)
+        self.__version += 1
+
+    def get_color_code(self, color: str) -> int:
+        """Retourne le code de palette d'une couleur (en l'ajoutant à la palette si besoin)."""
         assert color in mcolors.CSS4_COLORS, \
             f"self.__colors type must be in matplotlib colors. What is {color} ?"
-        self.__colors[(x, y)] = color
+        code = self.__palette_index.get(color)
+        if code is None:
+            code = len(self.__palette)
+            self.__palette.append(color)
+            self.__palette_index[color] = code
+        return code
 
+    def get_palette(self) -> List[str]:
+        """Retourne la palette : le nom de couleur associé à chaque code de la couche des couleurs."""
+        return list(self.__palette)
 
     def add_alpha(self, x: int, y: int, alpha: float) -> None:
         """Ajoute un indice d'opacité (alpha) entre 0 et 1 pour la case (x, y)."""
         assert 0 <= alpha <= 1, f"alpha value must be between 0 and 1. What is {alpha} ?"
-        self.__alpha[(x, y)] = alpha
+        self.__alpha[y, x] = alpha
 
     def add_symbol(self, x: int, y: int, symbol: Forme) -> None:
         """Place un symbole (`Forme`) au centre de la case (x, y)."""
@@ -179,65 +481,87 @@ class HexGridViewer:
 
     def get_color(self, x: int, y: int) -> str:
         """Retourne la couleur de la case (x, y)."""
-        return self.__colors[(x, y)]
+        return self.__palette[self.__colors[y, x]]
 
     def get_alpha(self, x: int, y: int) -> float:
         """Retourne l'opacité (alpha) de la case (x, y)."""
-        return self.__alpha[(x, y)]
+        return float(self.__alpha[y, x])
 
     def get_neighbours(self, x: int, y: int) -> List[Coords]:
         """
         Retourne la liste des coordonnées des hexagones voisins de l'hexagone en coordonnées (x,y).
         """
 
-        if y % 2 == 0:
-            #Cas ou y est paire, res [(2,0)...]
-            res = [(x + dx, y + dy) for dx, dy in ((1, 0), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1))]
-        else:
-            #Cas ou y est impaire
-            res = [(x + dx, y + dy) for dx, dy in ((1, 0), (1, 1), (0, 1), (-1, 0), (0, -1), (1, -1))]
-        #Return des voisins en vérifiant qu'ils sont bien dans les limites 
-        return [(dx, dy) for dx, dy in res if 0 <= dx < self.__width and 0 <= dy < self.__height]
+        width = self.__width
+        return [(n % width, n // width) for n in self.get_adjacency().get_lists()[y * width + x]]
+
+    def get_adjacency(self) -> HexAdjacency:
+        """Retourne la table de voisinage précalculée (partagée entre toutes les grilles de même taille)."""
+        return get_hex_adjacency(self.__width, self.__height)
+
+    def cell_id(self, x: int, y: int) -> int:
+        """Retourne l'identifiant entier de la case (x, y)."""
+        return y * self.__width + x
+
+    def cell_coords(self, cell: int) -> Coords:
+        """Retourne les coordonnées (x, y) de la case d'identifiant `cell`."""
+        return cell % self.__width, cell // self.__width
 
     def add_altitude(self, x: int, y: int, alt: float) -> None:
         """Définit l'altitude d'une case."""
-        self.__altitude[(x, y)] = alt
+        self.__altitude[y, x] = alt
+        self.__version += 1
 
     def get_altitude(self, x: int, y: int) -> float:
         """Obtient l'altitude d'une case."""
-        return self.__altitude[(x, y)]
+        return float(self.__altitude[y, x])
     
     def highest_altitude(self) -> float:
         """Retourne l'altitude avec ses coordonnées la plus haute de la grille"""
-        high_alt = -1.0
-        Coordinates = (-1, -1)
-        for x in range(self.__width):
-            for y in range(self.__height):
-                alt = self.get_altitude(x, y)
-                if alt > high_alt:
-                    high_alt = alt
-                    Coordinates = (x, y)
-        return high_alt, Coordinates
+        if self.__altitude.size == 0 or self.__altitude.max() <= -1.0:
+            return -1.0, (-1, -1)
+        # Parcours colonne par colonne (x puis y) : on garde la première case maximale rencontrée
+        x, y = np.unravel_index(np.argmax(self.__altitude.T), (self.__width, self.__height))
+        return float(self.__altitude[y, x]), (int(x), int(y))
 
     def add_terrain(self, x: int, y: int, terrain: str) -> None:
         """Définit le type de terrain d'une case."""
-        self.__terrain[(x, y)] = terrain
-        
-        # Attribuer la couleur selon le terrain
-        terrain_colors = {
-            "eau": "dodgerblue",
-            "sable": "sandybrown",
-            "herbe": "lightgreen",
-            "foret": "darkgreen",
-            "montagne": "lightgray"
-        }
+        assert terrain in TERRAIN_CODES, f"terrain must be in {TERRAIN_NAMES}. What is {terrain} ?"
+        code = TERRAIN_CODES[terrain]
+        self.__terrain[y, x] = code
+        self.__version += 1
 
-        if terrain in terrain_colors:
-            self.add_color(x, y, terrain_colors[terrain])
+        # Attribuer la couleur selon le terrain
+        if TERRAIN_COLORS[code] is not None:
+            self.add_color(x, y, TERRAIN_COLORS[code])
 
     def get_terrain(self, x: int, y: int) -> str:
         """Obtient le type de terrain d'une case."""
-        return self.__terrain[(x, y)]
+        return TERRAIN_NAMES[self.__terrain[y, x]]
+
+    def get_map_version(self) -> int:
+        """Retourne la version de la carte, qui change à chaque modification des altitudes, terrains ou couleurs."""
+        return self.__version
+
+    def mark_modified(self) -> None:
+        """À appeler après avoir modifié directement une couche (get_altitude_layer, ...) : invalide les caches."""
+        self.__version += 1
+
+    def get_altitude_layer(self) -> np.ndarray:
+        """Retourne la couche des altitudes (vue modifiable de forme (hauteur, largeur), indexée [y, x])."""
+        return self.__altitude
+
+    def get_terrain_layer(self) -> np.ndarray:
+        """Retourne la couche des codes de terrain (vue modifiable, indexée [y, x]), voir TERRAIN_NAMES."""
+        return self.__terrain
+
+    def get_color_layer(self) -> np.ndarray:
+        """Retourne la couche des codes couleur (vue modifiable, indexée [y, x]), voir get_palette."""
+        return self.__colors
+
+    def get_alpha_layer(self) -> np.ndarray:
+        """Retourne la couche des opacités (vue modifiable de forme (hauteur, largeur), indexée [y, x])."""
+        return self.__alpha
 
     def get_all_coords(self) -> List[Coords]:
         """Retourne toutes les coordonnées de la grille."""
@@ -249,152 +573,216 @@ class HexGridViewer:
         # Calculer les seuils, permet d'avoir des meilleurs seuil et donc une meilleure répartition des terrain
         quantiles = np.quantile(global_altitudes, [0.15, 0.35, 0.65, 0.85])
 
-        #Pour assigner terrain et alpha :
-        terrain_groups = defaultdict(list)
-
-        for vertex in self.get_all_coords():
-            x, y = vertex
-            altitude = self.get_altitude(x, y)
-            if altitude < quantiles[0]:  
-                terrain = "eau"
-                self.add_terrain(x, y, terrain)
-            elif altitude < quantiles[1]: 
-                terrain = "sable"
-                self.add_terrain(x, y, terrain)
-            elif altitude < quantiles[2]:  
-                terrain = "herbe"
-                self.add_terrain(x, y, terrain)
-            elif altitude < quantiles[3]:  
-                terrain = "foret"
-                self.add_terrain(x, y, terrain)
-            else:  
-                terrain = "montagne"
-                self.add_terrain(x, y, terrain)
-            
-            terrain_groups[terrain].append((x,y, altitude)) # {"montagne" : [(1,3,23)]}
-        
-        for terrain_type, cells in terrain_groups.items():
-            if not cells:
-                continue
-            
-            altitudes = [cell[2] for cell in cells]
-            min_alt = min(altitudes)
-            max_alt = max(altitudes)
-
-            if max_alt != min_alt:
-                altitude_range = max_alt - min_alt 
-            else: #cas ou les altitudes max et min sont les mêmes
-                altitude_range = 1
+        # Groupe de chaque case : nombre de seuils inférieurs ou égaux à son altitude (0 : eau ... 4 : montagne)
+        altitudes = self.__altitude
+        groups = np.searchsorted(quantiles, altitudes, side="right")
+        group_terrains = np.array([TERRAIN_CODES[name] for name in ("eau", "sable", "herbe", "foret", "montagne")], dtype=np.uint8)
+        group_colors = np.array([self.get_color_code(TERRAIN_COLORS[code]) for code in group_terrains], dtype=np.uint16)
 
-            is_water = (terrain_type == "eau") #Vrai ou Faux
+        #Terrain et couleur de toutes les cases en une fois
+        self.__terrain[...] = group_terrains[groups]
+        self.__colors[...] = group_colors[groups]
+        self.__version += 1
 
-            for x, y, altitude in cells:
+        #Altitudes minimale et maximale de chaque groupe
+        flat_groups, flat_altitudes = groups.ravel(), altitudes.ravel()
+        min_alt = np.full(len(group_terrains), np.inf)
+        max_alt = np.full(len(group_terrains), -np.inf)
+        np.minimum.at(min_alt, flat_groups, flat_altitudes)
+        np.maximum.at(max_alt, flat_groups, flat_altitudes)
 
-                #calcul et assignation de la normalisation, plus une altitude est grande plus sa normalisationest grande
-                normal = (altitude - min_alt) / altitude_range
+        #cas ou les altitudes max et min sont les mêmes (ou groupe vide) : étendue de 1
+        altitude_range = np.where(max_alt != min_alt, max_alt - min_alt, 1)
 
-                #Inversion de l'alpha en fonction de si c'est de l'eau, garde la plage de 0.4 à 1.0
-                if is_water:
-                    alpha = (1.0 - normal * 0.6)
-                    self.add_alpha(x,y,alpha)
-                else:
-                    alpha = (0.4 + normal * 0.6)
-                    self.add_alpha(x,y,alpha)
-                
+        #calcul de la normalisation, plus une altitude est grande plus sa normalisation est grande
+        normal = (altitudes - min_alt[groups]) / altitude_range[groups]
 
+        #Inversion de l'alpha en fonction de si c'est de l'eau, garde la plage de 0.4 à 1.0
+        self.__alpha[...] = np.where(groups == 0, 1.0 - normal * 0.6, 0.4 + normal * 0.6)
 
-    def high_points_fixation(self) -> None:
-        """Lisse les points isolés en moyennant avec leurs voisins."""
-        new_altitudes = {}
-        
-        for vertex in self.get_all_coords():
-            neighbours = self.get_neighbours(*vertex)
-            if neighbours:
-
-                # Moyenne entre altitude actuelle et moyenne des voisins
-                avg_altitude = sum(self.get_altitude(*n) for n in neighbours) / len(neighbours)
-                current = self.get_altitude(*vertex)
-                new_altitudes[vertex] = (current + avg_altitude) / 2
-            else:
-                new_altitudes[vertex] = self.get_altitude(*vertex)
-        
-        # Appliquer les nouvelles altitudes
-        for vertex, altitude in new_altitudes.items():
-            self.add_altitude(*vertex, altitude)        
+    def high_points_fixation(self, iterations: int = 1) -> None:
+        """
+        Lisse les points isolés en moyennant avec leurs voisins.
+        Chaque itération est une convolution sur la grille : la somme des voisins est obtenue par décalage
+        des tableaux, avec des décalages différents pour les lignes paires et impaires. Les cases du bord,
+        qui ont moins de voisins, sont moyennées sur leurs seuls voisins existants.
+        :param iterations: nombre de lissages successifs
+        """
+        height, width = self.__altitude.shape
+        # Grille entourée d'une bordure de zéros : les voisins hors grille ne comptent pas dans la somme
+        padded = np.zeros((height + 2, width + 2))
+
+        def neighbour_sum(layer: np.ndarray) -> np.ndarray:
+            """Somme des voisins de chaque case, selon les décalages de get_neighbours."""
+            padded[1:-1, 1:-1] = layer
+            total = np.zeros((height, width))
+            for row_start, offsets in ((0, EVEN_ROW_OFFSETS), (1, ODD_ROW_OFFSETS)):
+                rows = total[row_start::2]
+                for dx, dy in offsets:
+                    rows += padded[1 + dy + row_start: 1 + dy + height: 2, 1 + dx: 1 + dx + width]
+            return total
+
+        # Nombre de voisins de chaque case (moins de 6 sur les bords, aucun sur une grille 1x1)
+        count = neighbour_sum(np.ones((height, width)))
+        if not count.all():
+            return
 
+        altitude = self.__altitude.astype(np.float64)
+        for _ in range(iterations):
+            # Moyenne entre altitude actuelle et moyenne des voisins
+            smoothed = neighbour_sum(altitude)
+            smoothed /= count
+            smoothed += altitude
+            smoothed /= 2
+            altitude = smoothed
 
+        # Appliquer les nouvelles altitudes
+        self.__altitude[...] = altitude
+        self.__version += 1
 
     def generate_river_with_branches(self, current_coord: Coords, branch_probability=0.2, visited=None) -> List[Tuple[Coords, Coords]]:
         """
         Génère une rivière avec des embranchements.
         Retourne une liste de segments (tuple de deux coordonnées).
+        Le parcours en profondeur utilise une pile explicite : pas de limite de récursion sur les grandes cartes.
         """
         if visited is None:
             visited = set()
-        
-        if current_coord in visited:
-            return []
-        
-        visited.add(current_coord)
-        
-        x, y = current_coord
-        current_alt = self.get_altitude(x, y)
-        neighbors = self.get_neighbours(x, y)
-        
-        # Voisins strictement plus bas
-        downhill = [n for n in neighbors if self.get_altitude(n[0], n[1]) < current_alt and n not in visited]
-        
-        if not downhill:
-            return []
+
+        #Le parcours se fait sur les identifiants entiers des cases
+        visited_ids = {self.cell_id(*c) for c in visited}
+        neighbours = self.get_adjacency().get_lists()
+        altitudes = self.__altitude.ravel()
 
         links = []
-        # Choisir le voisin le plus bas pour la direction principale
-        best_neighbor = min(downhill, key=lambda n: self.get_altitude(n[0], n[1]))
-        links.append((current_coord, best_neighbor))
-        links.extend(self.generate_river_with_branches(best_neighbor, branch_probability, visited))
-
-        # Chance d'embranchements multiples
-        if len(downhill) > 1:
-            other_neighbors = [n for n in downhill if n != best_neighbor]
-            for neighbor in other_neighbors:
-                if random.random() < branch_probability:
-                    links.append((current_coord, neighbor))
-                    links.extend(self.generate_river_with_branches(neighbor, branch_probability * 0.7, visited))
-                
-        return links
+        # Pile des cases en cours : [case, probabilité d'embranchement, autres voisins plus bas, prochain indice]
+        stack = []
+        pending = (self.cell_id(*current_coord), branch_probability)
+        while pending is not None or stack:
+            if pending is not None:
+                current, probability = pending
+                pending = None
+                if current in visited_ids:
+                    continue
+                visited_ids.add(current)
+
+                # Voisins strictement plus bas
+                current_alt = altitudes[current]
+                downhill = [n for n in neighbours[current] if altitudes[n] < current_alt and n not in visited_ids]
+                if not downhill:
+                    continue
+
+                # Choisir le voisin le plus bas pour la direction principale
+                best_neighbor = min(downhill, key=lambda n: altitudes[n])
+                links.append((current, best_neighbor))
+                stack.append([current, probability, [n for n in downhill if n != best_neighbor], 0])
+                pending = (best_neighbor, probability)
+                continue
+
+            # Chance d'embranchements multiples, une fois la branche principale terminée
+            frame = stack[-1]
+            current, probability, other_neighbors, index = frame
+            if index >= len(other_neighbors):
+                stack.pop()
+                continue
+            frame[3] += 1
+            if random.random() < probability:
+                links.append((current, other_neighbors[index]))
+                pending = (other_neighbors[index], probability * 0.7)
+
+        visited.update(self.cell_coords(c) for c in visited_ids)
+        return [(self.cell_coords(a), self.cell_coords(b)) for a, b in links]
+
+    def compute_flow(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hydrologie de la carte, calculée par passes vectorisées :
+        - receivers : pour chaque case (identifiant à plat), son voisin de plus forte pente descendante
+          (-1 si aucun voisin n'est plus bas : cuvette ou bord)
+        - accumulation : nombre de cases dont l'eau s'écoule par cette case (elle-même comprise)
+        L'accumulation est propagée des sources vers l'aval, un "front" de cases à la fois :
+        une case est traitée quand toutes les cases qui s'écoulent vers elle l'ont été.
+        """
+        table = self.get_adjacency().table
+        altitudes = self.__altitude.ravel()
+        size = altitudes.size
+
+        #Altitude des voisins, +inf pour les voisins hors grille (indice -1 -> dernière valeur)
+        neighbour_alt = np.append(altitudes, np.inf)[table]
+        lowest = np.argmin(neighbour_alt, axis=1)
+        cells = np.arange(size)
+        receivers = np.where(neighbour_alt[cells, lowest] < altitudes, table[cells, lowest], -1).astype(np.int32)
+
+        accumulation = np.ones(size, dtype=np.int64)
+        has_receiver = receivers >= 0
+        donors = np.bincount(receivers[has_receiver], minlength=size)
+        frontier = np.nonzero(donors == 0)[0]
+        while frontier.size:
+            frontier = frontier[has_receiver[frontier]]
+            downstream = receivers[frontier]
+            np.add.at(accumulation, downstream, accumulation[frontier])
+            np.add.at(donors, downstream, -1)
+            downstream = np.unique(downstream)
+            frontier = downstream[donors[downstream] == 0]
+        return receivers, accumulation
+
+    def generate_rivers(self, threshold: int | None = None, river_share: float = 0.1) -> List[Tuple[Coords, Coords]]:
+        """
+        Génère le réseau de rivières à partir de l'accumulation d'écoulement (voir compute_flow).
+        Une case terrestre dont l'accumulation atteint `threshold` porte une rivière qui coule vers
+        son voisin le plus bas : les affluents apparaissent naturellement là où l'écoulement se rejoint.
+        Retourne une liste de segments (tuple de deux coordonnées), à passer à display_rivers.
+        :param threshold: accumulation minimale, en nombre de cases drainées. À seuil fixe, la proportion
+        de cases en rivière augmente avec la taille de la carte (les bassins versants sont plus grands).
+        :param river_share: si threshold vaut None, le seuil est choisi pour qu'environ cette proportion
+        des cases terrestres porte une rivière, quelle que soit la taille de la carte.
+        """
+        receivers, accumulation = self.compute_flow()
+
+        candidates = (receivers >= 0) & (self.__terrain.ravel() != WATER)
+        if threshold is None:
+            if not candidates.any():
+                return []
+            threshold = max(2, int(np.ceil(np.quantile(accumulation[candidates], 1.0 - river_share))))
+        river = (accumulation >= threshold) & candidates
+        sources = np.nonzero(river)[0]
+        ys, xs = np.divmod(sources, self.__width)
+        rys, rxs = np.divmod(receivers[sources], self.__width)
+        return [((x, y), (rx, ry)) for x, y, rx, ry in zip(xs.tolist(), ys.tolist(), rxs.tolist(), rys.tolist())]
 
-    
     def display_rivers(self, rivers: List[Tuple[Coords, Coords]]) -> None:
         """Affiche les rivières en coloriant les cases ET en traçant les liens."""
         for start, end in rivers:
             #Coordonnées du début
-            col_s, row_s = start
+            x_s, y_s = start
 
             #Coordonnées de la fin
-            col_e, row_e = end
+            x_e, y_e = end
 
-            self.add_color(row_s, col_s, "dodgerblue")
-            self.add_color(row_e, col_e, "dodgerblue")
+            self.add_color(x_s, y_s, "dodgerblue")
+            self.add_color(x_e, y_e, "dodgerblue")
 
-    def generate_map(self) -> None:
+    def diamond_square(self, rng: np.random.Generator) -> None:
         """
-        Génère une carte avec altitudes et terrains cohérents
-        via l'algorithme Diamond-Square.
+        Remplit la couche des altitudes via l'algorithme Diamond-Square.
+        Chaque passe (diamond puis square) est faite en une seule opération sur les tableaux numpy,
+        avec un tirage groupé des perturbations aléatoires. Fonctionne pour toute largeur et hauteur
+        (les indices sont pris modulo la taille de la grille).
         """
-        
+        width, height = self.__width, self.__height
+        alt = self.__altitude
+
         # Initialisation : tout à 0
-        for x in range(self.get_width()):
-            for y in range(self.get_height()):
-                self.add_altitude(x, y, 0)
+        alt.fill(0)
+        self.__version += 1
 
         # Initialiser les 4 coins
-        self.add_altitude(0, 0, random.randint(50, 150))
-        self.add_altitude(self.get_width() - 1, 0, random.randint(50, 150))
-        self.add_altitude(0, self.get_height() - 1, random.randint(50, 150))
-        self.add_altitude(self.get_width() - 1, self.get_height() - 1, random.randint(50, 150))
+        alt[0, 0] = rng.integers(50, 151)
+        alt[0, width - 1] = rng.integers(50, 151)
+        alt[height - 1, 0] = rng.integers(50, 151)
+        alt[height - 1, width - 1] = rng.integers(50, 151)
 
         randomness = 120
-        tileWidth = min(self.get_width(), self.get_height()) - 1
+        tileWidth = min(width, height) - 1
         step = 1
         while step < tileWidth:
             step *= 2
@@ -404,104 +792,94 @@ class HexGridViewer:
             halfStep = step // 2
             if halfStep <= 0:
                 break
-            
-            # Diamond step
-            for x in range(0, self.get_width(), step):
-                for y in range(0, self.get_height(), step):
-                    x2 = (x + step) % self.get_width()
-                    y2 = (y + step) % self.get_height()
-                    c1 = self.get_altitude(x, y)
-                    c2 = self.get_altitude(x2, y)
-                    c3 = self.get_altitude(x, y2)
-                    c4 = self.get_altitude(x2, y2)
-                    avg = (c1 + c2 + c3 + c4) / 4.0
-                    avg += random.uniform(-randomness, randomness)
-                    xm = (x + halfStep) % self.get_width()
-                    ym = (y + halfStep) % self.get_height()
-                    self.add_altitude(xm, ym, avg)
-            
-            # Square step
-            for x in range(0, self.get_width(), halfStep):
-                for y in range((x + halfStep) % step, self.get_height(), step):
-                    neighbors = []
-                    if self.get_altitude(x, (y - halfStep) % self.get_height()) is not None:
-                        neighbors.append(self.get_altitude(x, (y - halfStep) % self.get_height()))
-                    if self.get_altitude(x, (y + halfStep) % self.get_height()) is not None:
-                        neighbors.append(self.get_altitude(x, (y + halfStep) % self.get_height()))
-                    if self.get_altitude((x - halfStep) % self.get_width(), y) is not None:
-                        neighbors.append(self.get_altitude((x - halfStep) % self.get_width(), y))
-                    if self.get_altitude((x + halfStep) % self.get_width(), y) is not None:
-                        neighbors.append(self.get_altitude((x + halfStep) % self.get_width(), y))
-                    if neighbors:
-                        avg = sum(neighbors) / len(neighbors)
-                        avg += random.uniform(-randomness, randomness)
-                        self.add_altitude(x, y, avg)
-            
+
+            # Diamond step : le centre de chaque carré reçoit la moyenne de ses 4 coins
+            xs = np.arange(0, width, step)
+            ys = np.arange(0, height, step)
+            x2 = (xs + step) % width
+            y2 = (ys + step) % height
+            avg = (alt[np.ix_(ys, xs)] + alt[np.ix_(ys, x2)] + alt[np.ix_(y2, xs)] + alt[np.ix_(y2, x2)]) / 4.0
+            avg += rng.uniform(-randomness, randomness, size=avg.shape)
+            alt[np.ix_((ys + halfStep) % height, (xs + halfStep) % width)] = avg
+
+            # Square step : chaque milieu d'arête reçoit la moyenne de ses 4 voisins en losange.
+            # Les colonnes multiples de step commencent à halfStep, les autres à 0.
+            updates = []
+            for x_start, y_start in ((0, halfStep), (halfStep, 0)):
+                xs = np.arange(x_start, width, step)
+                ys = np.arange(y_start, height, step)
+                if xs.size == 0 or ys.size == 0:
+                    continue
+                avg = (alt[np.ix_((ys - halfStep) % height, xs)] + alt[np.ix_((ys + halfStep) % height, xs)]
+                       + alt[np.ix_(ys, (xs - halfStep) % width)] + alt[np.ix_(ys, (xs + halfStep) % width)]) / 4.0
+                avg += rng.uniform(-randomness, randomness, size=avg.shape)
+                updates.append((ys, xs, avg))
+            for ys, xs, avg in updates:
+                alt[np.ix_(ys, xs)] = avg
+
             randomness *= 0.6
             step //= 2
 
+    def generate_map(self, seed: int | None = None) -> None:
+        """
+        Génère une carte avec altitudes et terrains cohérents
+        via l'algorithme Diamond-Square.
+        :param seed: graine du générateur numpy (None : carte aléatoire différente à chaque appel)
+        """
+        rng = np.random.default_rng(seed)
+        self.diamond_square(rng)
+
         # Lissage
-        for _ in range(3):
-            self.high_points_fixation()
+        self.high_points_fixation(iterations=3)
 
         # Génération des terrains
-        allaltitudes = [self.get_altitude(*v) for v in self.get_all_coords()]
-        allquantiles = np.quantile(allaltitudes, [0.15, 0.35, 0.65, 0.85])
-        self.generate_terrain(allaltitudes)
+        self.generate_terrain(self.__altitude.ravel())
 
 
-        # ===== GÉNÉRATION AMÉLIORÉE DES RIVIÈRES =====
-        # Identifier les points hauts (foret et montagne)
-        high_points = [n for n in self.get_all_coords()
-                    if self.get_terrain(*n) in ["foret", "montagne"]]
-        
-        # Filtrer pour ne garder que les points vraiment hauts
-        altitude_threshold = np.percentile(allaltitudes, 70)
-        high_points = [v for v in high_points if self.get_altitude(*v) > altitude_threshold]
-        
-        # Augmenter le nombre de rivières : environ 1 pour 30-50 points hauts
-        num_rivers = max(3, len(high_points) // 40)
-        
-        # Générer plusieurs rivières indépendantes
-        used_starts = set()
-        for _ in range(num_rivers):
-            if high_points:
-                # Sélectionner un point de départ non utilisé
-                available_starts = [p for p in high_points if p not in used_starts]
-                if not available_starts:
-                    break
-                    
-                start = random.choice(available_starts)
-                used_starts.add(start)
-                
-                # Générer la rivière avec plus d'embranchements
-                rivers = self.generate_river_with_branches(start, branch_probability=0.25)
-                self.display_rivers(rivers)
-                
-                # Marquer une zone autour du départ pour éviter des rivières trop proches
-                for neighbor in self.get_neighbours(*start):
-                    used_starts.add(neighbor)
+        # ===== GÉNÉRATION DES RIVIÈRES =====
+        # Les rivières suivent l'écoulement de l'eau : les cases qui drainent assez de terrain en amont
+        rivers = self.generate_rivers()
+        self.display_rivers(rivers)
+
+    def _frontier_bfs(self, start: int | np.ndarray, max_distance: int | None = None,
+                      goal: int = -1) -> Tuple[List[np.ndarray], np.ndarray]:
+        """
+        Parcours en largeur niveau par niveau : toute la frontière est développée d'un coup avec NumPy
+        (voisins lus dans la table d'adjacence, cases déjà vues masquées, doublons retirés).
+        np.unique(return_index=True) garde la première découverte de chaque case : l'ordre des cases
+        et les parents sont exactement ceux d'un parcours avec une file.
+        `start` peut être un tableau de cases distinctes (parcours multi-sources).
+        S'arrête à max_distance, ou dès que `goal` est découvert.
+        Retourne les cases de chaque niveau et le tableau des parents (-1 : non visité, une source est son
+        propre parent).
+        """
+        table = self.get_adjacency().table
+        parent = np.full(len(table), -1, dtype=np.int32)
+        frontier = np.atleast_1d(np.asarray(start, dtype=np.int32))
+        parent[frontier] = frontier
+        levels = [frontier]
+
+        while len(frontier) and (max_distance is None or len(levels) <= max_distance) \
+                and (goal < 0 or parent[goal] < 0):
+            candidates = table[frontier].ravel()
+            fresh = np.flatnonzero(candidates >= 0)
+            fresh = fresh[parent[candidates[fresh]] < 0]
+            cells, first = np.unique(candidates[fresh], return_index=True)
+            order = np.argsort(first)
+            frontier, first = cells[order], fresh[first[order]]
+            if not len(frontier):
+                break
+            parent[frontier] = levels[-1][first // 6]
+            levels.append(frontier)
+        return levels, parent
 
     def bfs(self, start_x: int, start_y: int, max_distance: int) -> Dict[int, List[Coords]]:
-            """Implémentation du BFS sur le graphe."""
-            start = (start_x, start_y)
-            visited = {start: 0}
-            queue = deque([(start, 0)])
+            """Implémentation du BFS sur le graphe (parcours vectorisé niveau par niveau, voir _frontier_bfs)."""
+            levels, _ = self._frontier_bfs(self.cell_id(start_x, start_y), max_distance)
             case_per_distance = {}
-            
-            while queue:
-                (x, y), distance = queue.popleft()
-
-                if distance not in case_per_distance:
-                    case_per_distance[distance] = []
-                case_per_distance[distance].append((x, y))
-
-                if distance < max_distance:
-                    neighbors = self.get_neighbours(x, y)
-                    for neighbor in neighbors:
-                        if neighbor not in visited:
-                            visited[neighbor] = distance + 1
-                            queue.append((neighbor, distance + 1))
+            for distance, cells in enumerate(levels):
+                ys, xs = np.divmod(cells, self.__width)
+                case_per_distance[distance] = list(zip(xs.tolist(), ys.tolist()))
             return case_per_distance
 
     def find_path_bfs(self, start: Coords, goal: Coords) -> List[Coords]:
@@ -509,106 +887,497 @@ class HexGridViewer:
         Trouve le chemin le plus court entre deux points.
         Complexité : O(V + E) sur une grille sans poids.
         """
-        # File pour le parcours (BFS)
-        queue = deque([start])
-        # Dictionnaire pour reconstruire le chemin : {enfant: parent}
-        parent_map = {start: None}
-        
-        found = False
-        while queue:
-            current = queue.popleft()
-            
-            if current == goal:
-                found = True
-                break
-                
-            for neighbor in self.get_neighbours(current[0], current[1]):
-                if neighbor not in parent_map:
-                    parent_map[neighbor] = current
-                    queue.append(neighbor)
-        
-        if not found:
+        start_id, goal_id = self.cell_id(*start), self.cell_id(*goal)
+
+        # Parcours niveau par niveau jusqu'à découvrir l'arrivée : parent_map[enfant] = parent (-1 : non visité)
+        _, parent_map = self._frontier_bfs(start_id, goal=goal_id)
+        if parent_map[goal_id] < 0:
             return []
 
         # Reconstruction du chemin en remontant les parents
-        path = []
+        return self._rebuild_path(parent_map, start_id, goal_id)
+
+    def distance_field(self, seeds: List[Coords] | np.ndarray, weighted: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distance de chaque case à la source la plus proche, en un seul parcours multi-sources
+        (distance aux villes, à l'eau, aux rivières, ...).
+        `seeds` est une liste de coordonnées ou un masque booléen de forme (hauteur, largeur).
+        - weighted=False : nombre de pas (BFS vectorisé, toutes les cases sont traversables)
+        - weighted=True : coût du trajet de chaque case jusqu'à la source la plus proche avec get_movement_cost
+          (Dijkstra inverse : les coûts ne sont pas symétriques ; eau et rivières interdites, mais une source
+          peut être une case interdite, que l'on rejoint sans la traverser)
+        Retourne deux tableaux (hauteur, largeur) : la distance (inf si inaccessible) et l'identifiant
+        de la source la plus proche (cell_id, -1 si inaccessible).
+        """
+        if isinstance(seeds, np.ndarray) and seeds.dtype == bool:
+            ids = np.flatnonzero(seeds.ravel())
+        else:
+            ids = np.array(list(dict.fromkeys(self.cell_id(x, y) for x, y in seeds)), dtype=np.int64)
+        shape = (self.__height, self.__width)
+        if not len(ids):
+            return np.full(shape, np.inf), np.full(shape, -1, dtype=np.int32)
+
+        if weighted:
+            #Parents du Dijkstra inverse : case suivante vers la source, dont _tree_roots donne l'étiquette
+            came_from, cost_so_far = self._search(ids.tolist(), None, reverse=True)
+            tree = np.array(came_from, dtype=np.int32)
+            distance = np.array(cost_so_far)
+        else:
+            levels, tree = self._frontier_bfs(ids)
+            distance = np.full(len(tree), np.inf)
+            for d, cells in enumerate(levels):
+                distance[cells] = d
+            tree = np.where(tree == np.arange(len(tree)), -1, tree)
+        labels = self._tree_roots(tree, distance).astype(np.int32)
+        return distance.reshape(shape), labels.reshape(shape)
+
+    def _rebuild_path(self, parent_map, start: int, goal: int) -> List[Coords]:
+        """Reconstruit le chemin start -> goal en remontant un tableau de parents (identifiants de cases)."""
+        path = [self.cell_coords(goal)]
         curr = goal
-        while curr is not None:
-            path.append(curr)
-            curr = parent_map[curr]
-        
+        while curr != start:
+            curr = int(parent_map[curr])
+            path.append(self.cell_coords(curr))
         return path[::-1] # Inverser pour aller du départ à l'arrivé
 
     def get_movement_cost(self, current: Coords, neighbor: Coords) -> float:
         """Calcule le coût basé sur le type de terrain et la pente."""
-        terrain = self.get_terrain(neighbor[0], neighbor[1])
-        
-        # Coûts de base par type de terrain terrestres
-        costs = {
-            "herbe": 2.0,
-            "sable": 1.0,
-            "foret": 5.0,
-            "montagne": 10.0
-        }
-        
-        base_cost = costs.get(terrain, 1.0)
+        # Coût de base du type de terrain (table TERRAIN_COSTS)
+        base_cost = TERRAIN_COSTS[self.__terrain[neighbor[1], neighbor[0]]]
         
         # Ajout du coût lié à l'altitude (pente entre deux cases)
         pente = abs(self.get_altitude(*neighbor) - self.get_altitude(*current))
-        return base_cost + (pente * 0.5)
+        return float(base_cost + (pente * 0.5))
 
-    def find_path_smart(self, start: Coords, goal: Coords) -> List[Coords]:
-        """Dijkstra en tenant compte du terrain"""
+    def _routing_arrays(self) -> Tuple[List[float], List[float], List[bool]]:
+        """
+        Retourne, à plat et indexés par identifiant de case, les données utilisées par les recherches de chemin :
+        coût de base du terrain, altitude, et case interdite (eau ou rivière).
+        Le coût pour entrer dans la case n depuis c vaut base[n] + |alt[n] - alt[c]| * 0.5, comme get_movement_cost.
+        Les listes sont recalculées seulement quand la version de la carte change.
+        """
+        if self.__routing is not None and self.__routing[0] == self.__version:
+            return self.__routing[1]
 
-        
-        frontier = []
-        heapq.heappush(frontier, (0, start))
-        came_from = {start: None}
-        cost_so_far = {start: 0}
+        base, _, blocked = self._routing_values()
+
+        #Plus petit coût d'une case franchissable, pour les heuristiques des recherches A*
+        min_cost = float(base[~blocked].min()) if not blocked.all() else 1.0
+        self.__routing = (self.__version, (base.tolist(), self.__altitude.ravel().tolist(), blocked.tolist()), min_cost)
+        return self.__routing[1]
+
+    def _routing_values(self, cells: np.ndarray | None = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Coût de base, altitude et case interdite des cases `cells` (identifiants, None : toute la grille),
+        lus directement dans les couches : pour relire quelques cases modifiées sans refaire _routing_arrays.
+        """
+        terrain, altitude, colors = self.__terrain.ravel(), self.__altitude.ravel(), self.__colors.ravel()
+        if cells is not None:
+            terrain, altitude, colors = terrain[cells], altitude[cells], colors[cells]
+
+        blocked = ~TERRAIN_PASSABLE[terrain]
+        river_code = self.__palette_index.get("dodgerblue")
+        if river_code is not None:
+            blocked |= colors == river_code
+        return TERRAIN_COSTS[terrain], altitude, blocked
+
+    def _min_passable_cost(self) -> float:
+        """Plus petit coût de base d'une case franchissable (mis en cache avec _routing_arrays)."""
+        self._routing_arrays()
+        return self.__routing[2]
+
+    def _hex_heuristic(self, goal: Coords, min_cost: float | None = None) -> Callable[[int], float]:
+        """
+        Heuristique A* vers `goal`, évaluée seulement pour les cases réellement poussées dans la file :
+        distance hexagonale (coordonnées cubiques) multipliée par le plus petit coût de terrain franchissable
+        de la carte, ou par `min_cost` si fourni (borne fixe qui reste valable quand la carte change).
+        """
+        width = self.__width
+        if min_cost is None:
+            min_cost = self._min_passable_cost()
+        gx, gy = goal
+        goal_q = gx - (gy - (gy & 1)) // 2
+
+        def heuristic(cell: int) -> float:
+            y, x = divmod(cell, width)
+            dq, dr = x - (y - (y & 1)) // 2 - goal_q, y - gy
+            return (abs(dq) + abs(dr) + abs(dq + dr)) // 2 * min_cost
+        return heuristic
+
+    def get_nodes_expanded(self) -> int:
+        """Retourne le nombre de cases développées par la dernière recherche de chemin."""
+        return self.__nodes_expanded
+
+    def find_path_smart(self, start: Coords, goal: Coords, mode: str = "dijkstra",
+                        resolution: float | None = 0.5) -> List[Coords]:
+        """
+        Dijkstra en tenant compte du terrain.
+        :param mode:
+         - "dijkstra" (par défaut)
+         - "astar" : A* guidé par la distance hexagonale multipliée par le plus petit coût de terrain franchissable
+         - "alt" : A* guidé en plus par les bornes de l'inégalité triangulaire sur des repères (voir build_landmarks)
+         - "dial" : Dijkstra à files par seaux sur des coûts arrondis à `resolution` près (voir _dial_search) ;
+           resolution=None revient au Dijkstra exact
+        Les heuristiques sont admissibles et cohérentes : les modes "dijkstra", "astar" et "alt" renvoient un chemin
+        de même coût optimal. Le mode "dial" peut renvoyer un chemin un peu plus cher (borne dans _dial_search).
+        Le nombre de cases développées est ensuite disponible via get_nodes_expanded.
+        """
+        assert mode in ("dijkstra", "astar", "alt", "dial"), \
+            f"mode must be 'dijkstra', 'astar', 'alt' or 'dial'. What is {mode} ?"
+        assert resolution is None or resolution > 0, f"resolution must be positive. What is {resolution} ?"
+        start_id, goal_id = self.cell_id(*start), self.cell_id(*goal)
+
+        if mode == "dial" and resolution is not None:
+            came_from = self._dial_search(start_id, goal_id, resolution)
+            if start_id != goal_id and came_from[goal_id] < 0: return []
+            return self._rebuild_path(came_from, start_id, goal_id)
+
+        heuristic = None
+        if mode in ("astar", "alt"):
+            heuristic = self._hex_heuristic(goal)
+            if mode == "alt":
+                heuristic = self._landmark_heuristic(start_id, goal_id, heuristic)
+
+        came_from, _ = self._search(start_id, {goal_id}, heuristic)
+
+        # Reconstruction du chemin en remontant les parents
+        if start_id != goal_id and came_from[goal_id] < 0: return []
+        return self._rebuild_path(came_from, start_id, goal_id)
+
+    def _search(self, start: int | List[int], goals: set | None, heuristic: Callable[[int], float] | None = None,
+                reverse: bool = False) -> Tuple[List[int], List[float]]:
+        """
+        Recherche de plus court chemin sur les identifiants de cases (Dijkstra, ou A* si `heuristic` est fourni :
+        fonction donnant la borne inférieure du coût restant depuis une case, appelée pour chaque case poussée).
+        S'arrête quand toutes les cases de `goals` sont atteintes (None : parcourt toutes les cases accessibles).
+        Retourne le tableau des parents et celui des coûts depuis `start`.
+        `start` peut être une liste de cases (recherche multi-sources : coût depuis la plus proche).
+        Si `reverse` est vrai, la recherche suit les arcs à l'envers : les coûts sont ceux des trajets
+        de chaque case VERS `start`, et le "parent" d'une case est la case suivante sur ce trajet.
+        Une case de `start` peut être interdite : on peut en partir (recherche directe) ou y arriver (inverse).
+        """
+        remaining = set(goals) if goals is not None else None
+        neighbours = self.get_adjacency().get_lists()
+        base, alt, blocked = self._routing_arrays()
+
+        starts = [start] if isinstance(start, (int, np.integer)) else list(start)
+        frontier = [(0.0, 0.0, s) for s in starts]
+        came_from = [-1] * len(neighbours)
+        cost_so_far = [float("inf")] * len(neighbours)
+        for s in starts:
+            cost_so_far[s] = 0.0
+        expanded = 0
 
         while frontier:
-            _, current = heapq.heappop(frontier)
+            _, cost, current = heapq.heappop(frontier)
 
-            if current == goal:
-                break
+            #Entrée obsolète de la file (la case a déjà été atteinte moins cher)
+            if cost > cost_so_far[current]:
+                continue
+            expanded += 1
+
+            if remaining is not None:
+                remaining.discard(current)
+                if not remaining:
+                    break
+
+            alt_current = alt[current]
+            if reverse:
+                #On ne peut pas entrer dans une case interdite : aucun arc n'y mène, sauf vers une arrivée
+                if blocked[current] and came_from[current] >= 0:
+                    continue
+                for neighbor in neighbours[current]:
+                    new_cost = cost + base[current] + abs(alt[neighbor] - alt_current) * 0.5
+                    if new_cost < cost_so_far[neighbor]:
+                        cost_so_far[neighbor] = new_cost
+                        heapq.heappush(frontier, (new_cost, new_cost, neighbor))
+                        came_from[neighbor] = current
+                continue
 
-            for neighbor in self.get_neighbours(current[0], current[1]):
-                terrain_direct = self.get_terrain(neighbor[0], neighbor[1])
-                couleur_directe = self.get_color(neighbor[0], neighbor[1])
-                
-                #Vérification que le terrain n'est pas de l'eau, et n'a pas la couleur bleuE
-                if terrain_direct == "eau" or couleur_directe == "dodgerblue":
+            for neighbor in neighbours[current]:
+                #Vérification que le terrain n'est pas de l'eau, et n'a pas la couleur bleue
+                if blocked[neighbor]:
                     continue
 
+                new_cost = cost + base[neighbor] + abs(alt[neighbor] - alt_current) * 0.5
 
-                new_cost = cost_so_far[current] + self.get_movement_cost(current, neighbor)
-                
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                if new_cost < cost_so_far[neighbor]:
                     cost_so_far[neighbor] = new_cost
-                    heapq.heappush(frontier, (new_cost, neighbor))
+                    priority = new_cost if heuristic is None else new_cost + heuristic(neighbor)
+                    heapq.heappush(frontier, (priority, new_cost, neighbor))
                     came_from[neighbor] = current
 
-        # Reconstruction du chemin en remontant les parents
-        if goal not in came_from: return []
-        path, curr = [], goal
-        while curr is not None:
-            path.append(curr)
-            curr = came_from[curr]
-        return path[::-1]
-
-    def find_set(self, parent: Dict[Coords, Coords], i: Coords) -> Coords:
-        """Trouve le représentant (racine) de l'ensemble (Union-Find)."""
-        if parent[i] == i:
-            return i
-        parent[i] = self.find_set(parent, parent[i]) # Compression de chemin
-        return parent[i]
-
-    def union_sets(self, parent: Dict[Coords, Coords], i: Coords, j: Coords):
-        """Réunit deux ensembles (Union-Find)."""
-        root_i = self.find_set(parent, i)
-        root_j = self.find_set(parent, j)
-        if root_i != root_j:
-            parent[root_i] = root_j
+        self.__nodes_expanded = expanded
+        return came_from, cost_so_far
+
+    def _quantized_arcs(self, resolution: float) -> Tuple[np.ndarray, int]:
+        """
+        Coût de chaque arc en multiples entiers de `resolution` (arrondi au plus proche), sous forme d'un
+        tableau (N, 6) int32 aligné sur la table d'adjacence : steps[c, k] est le coût pour aller de c dans
+        son k-ième voisin, -1 si ce voisin est hors de la grille ou interdit. Retourne aussi le nombre de seaux
+        nécessaire à _dial_search. Mis en cache pour la version courante de la carte et cette résolution.
+        """
+        if self.__quantized is not None and self.__quantized[:2] == (self.__version, resolution):
+            return self.__quantized[2]
+
+        base, altitude, blocked = self._routing_values()
+        table = self.get_adjacency().table
+        steps = np.empty(table.shape, dtype=np.int32)
+        top = 0.0
+        #Une colonne (un voisin) à la fois : pas de tableau (N, 6) de flottants intermédiaire
+        for k in range(6):
+            target = np.where(table[:, k] >= 0, table[:, k], 0)
+            costs = np.rint((base[target] + np.abs(altitude[target] - altitude) * 0.5) / resolution)
+            valid = (table[:, k] >= 0) & ~blocked[target]
+            top = max(top, costs[valid].max(initial=0))
+            assert top < np.iinfo(np.int32).max, f"resolution {resolution} is too small for these movement costs"
+            steps[:, k] = np.where(valid, costs, -1)
+        steps.setflags(write=False)
+        #Le plus grand coût d'arc borne l'écart entre le seau courant et le plus éloigné
+        slots = int(top) + 2
+        self.__quantized = (self.__version, resolution, (steps, slots))
+        return steps, slots
+
+    def _dial_search(self, start: int, goal: int, resolution: float) -> List[int]:
+        """
+        Dijkstra de start à goal avec une file par seaux (algorithme de Dial) : chaque coût d'arc est arrondi au
+        multiple de `resolution` le plus proche, les coûts deviennent des entiers et la file est un tableau
+        circulaire de listes indexé par le coût. Pas de tas ni de tuples : chaque insertion/extraction est en O(1).
+        Retourne le tableau des parents (-1 : non atteint).
+
+        Borne d'erreur : chaque arc est arrondi d'au plus q/2 (q = resolution). Le chemin P_q trouvé est optimal
+        pour les coûts arrondis, donc pour les coûts exacts :
+            exact(P_q) <= exact(P*) + (|P*| + |P_q|) * q / 2
+        où P* est le chemin optimal et |P| le nombre de pas. Avec q = 0.5 les coûts de terrain (1, 2, 5, 10) sont
+        exacts, seule la pente est arrondie.
+        """
+        steps, slots = self._quantized_arcs(resolution)
+        #Vues à plat (sans copie) : la case c a ses 6 arcs aux positions 6c à 6c + 5 des deux tableaux
+        table = self.get_adjacency().table.ravel().data
+        arcs = steps.ravel().data
+        buckets = [[] for _ in range(slots)]
+        came_from = [-1] * len(steps)
+        cost_so_far = [float("inf")] * len(steps)
+        cost_so_far[start] = 0
+        buckets[0].append(start)
+        pending = 1
+        current = 0
+        expanded = 0
+
+        while pending:
+            bucket = buckets[current % slots]
+            while bucket:
+                node = bucket.pop()
+                pending -= 1
+                #Entrée obsolète (la case a été atteinte moins cher depuis)
+                if cost_so_far[node] != current:
+                    continue
+                expanded += 1
+                if node == goal:
+                    pending = 0
+                    break
+                for k in range(6 * node, 6 * node + 6):
+                    step = arcs[k]
+                    if step < 0:
+                        continue
+                    neighbor = table[k]
+                    new_cost = current + step
+                    if new_cost < cost_so_far[neighbor]:
+                        cost_so_far[neighbor] = new_cost
+                        came_from[neighbor] = node
+                        buckets[new_cost % slots].append(neighbor)
+                        pending += 1
+            current += 1
+
+        self.__nodes_expanded = expanded
+        return came_from
+
+    def build_landmarks(self, k: int = 8, seed: int | None = None) -> Dict[str, float]:
+        """
+        Prétraitement ALT pour find_path_smart(mode="alt") : choisit `k` repères sur la terre ferme et calcule,
+        par Dijkstra complet, le coût de chaque case depuis et vers chaque repère.
+        Le premier repère est tiré au hasard, chaque suivant est la case accessible la plus éloignée des précédents.
+        Les données sont invalidées (puis recalculées à la demande) quand la carte est modifiée.
+        Retourne un rapport : nombre de repères, durée du prétraitement et mémoire utilisée par repère (octets).
+        """
+        t0 = time.perf_counter()
+        _, _, blocked = self._routing_arrays()
+        land = np.flatnonzero(~np.array(blocked, dtype=bool))
+        assert land.size > 0, "landmarks need at least one land cell"
+
+        rng = np.random.default_rng(seed)
+        landmark = int(rng.choice(land))
+        cells, forward, backward = [], [], []
+        closest = np.full(land.size, np.inf)
+        for _ in range(k):
+            cells.append(landmark)
+            forward.append(array("d", self._search(landmark, None)[1]))
+            backward.append(array("d", self._search(landmark, None, reverse=True)[1]))
+
+            # Repère suivant : la case terrestre accessible la plus éloignée des repères déjà choisis
+            reach = np.frombuffer(forward[-1])[land]
+            closest = np.minimum(closest, np.where(np.isfinite(reach), reach, np.inf))
+            candidates = np.where(np.isfinite(closest), closest, -1)
+            if candidates.max() <= 0:
+                break
+            landmark = int(land[np.argmax(candidates)])
+
+        #Une ligne array("d") par repère : 8 octets par case, lue case par case pendant les recherches
+        self.__landmarks = {"version": self.__version, "k": k, "seed": seed, "cells": cells,
+                            "forward": forward, "backward": backward}
+        return {"landmarks": len(cells), "seconds": time.perf_counter() - t0,
+                "bytes_per_landmark": (forward[0].itemsize * len(forward[0])) * 2}
+
+    def get_landmarks(self) -> List[Coords]:
+        """Retourne les coordonnées des repères ALT courants (liste vide si aucun)."""
+        if self.__landmarks is None:
+            return []
+        return [self.cell_coords(c) for c in self.__landmarks["cells"]]
+
+    def _landmark_heuristic(self, start: int, goal: int, floor: Callable[[int], float],
+                            active: int = 8, rebuild: bool = True) -> Callable[[int], float]:
+        """
+        Heuristique ALT vers `goal` : borne inférieure (inégalité triangulaire) max sur les repères L de
+        d(L, goal) - d(L, v) et d(v, L) - d(goal, L), et de floor(v) (heuristique hexagonale).
+        Seuls les `active` termes donnant la meilleure borne depuis `start` sont gardés, et la borne n'est
+        évaluée que pour les cases poussées dans la file : rien n'est calculé sur toute la grille.
+        Les repères sont (re)calculés si la carte a changé depuis leur construction ; avec rebuild=False,
+        des repères absents ou périmés donnent simplement `floor`.
+        """
+        if self.__landmarks is None or self.__landmarks["version"] != self.__version:
+            if not rebuild:
+                return floor
+            previous = self.__landmarks or {"k": 8, "seed": None}
+            self.build_landmarks(previous["k"], previous["seed"])
+
+        #Termes (signe, constante, ligne) : borne = signe * (ligne[v] - constante)
+        #Un terme dont la constante est infinie (goal hors de portée du repère) n'apporte rien
+        terms = []
+        for row in self.__landmarks["forward"]:
+            if row[goal] < float("inf"):
+                terms.append((-1.0, row[goal], row))
+        for row in self.__landmarks["backward"]:
+            if row[goal] < float("inf"):
+                terms.append((1.0, row[goal], row))
+        terms.sort(key=lambda term: term[0] * (term[2][start] - term[1]), reverse=True)
+        forward_terms = [(constant, row) for sign, constant, row in terms[:active] if sign < 0]
+        backward_terms = [(constant, row) for sign, constant, row in terms[:active] if sign > 0]
+
+        def heuristic(cell: int) -> float:
+            best = floor(cell)
+            for constant, row in forward_terms:
+                bound = constant - row[cell]
+                if bound > best:
+                    best = bound
+            for constant, row in backward_terms:
+                bound = row[cell] - constant
+                if bound > best:
+                    best = bound
+            return best
+        return heuristic
+
+    def flow_field(self, goal: Coords) -> np.ndarray:
+        """
+        Champ de directions vers `goal` pour un grand nombre d'agents allant au même endroit : un seul Dijkstra
+        inverse depuis goal, puis pour chaque case l'indice (0 à 5, colonne de la table d'adjacence) du voisin
+        à prendre pour s'en rapprocher au moindre coût, -1 pour l'arrivée et les cases qui ne peuvent pas l'atteindre.
+        Tableau int8 (hauteur, largeur) gardé en cache par arrivée jusqu'à la prochaine modification de la carte.
+        """
+        if self.__flow_fields is None or self.__flow_fields["version"] != self.__version:
+            self.__flow_fields = {"version": self.__version, "fields": {}}
+        fields = self.__flow_fields["fields"]
+        goal_id = self.cell_id(*goal)
+        if goal_id not in fields:
+            came_from, _ = self._search(goal_id, None, reverse=True)
+            following = np.array(came_from, dtype=np.int32)
+            table = self.get_adjacency().table
+            directions = np.full(len(table), -1, dtype=np.int8)
+            for k in range(6):
+                directions[(table[:, k] == following) & (following >= 0)] = k
+            directions = directions.reshape(self.__height, self.__width)
+            directions.setflags(write=False)
+            fields[goal_id] = directions
+        return fields[goal_id]
+
+    def follow_flow(self, start: Coords, goal: Coords) -> List[Coords]:
+        """
+        Chemin de coût minimal de start à goal lu dans le champ de directions (aucune recherche une fois
+        le champ calculé, O(longueur du chemin)). Liste vide si goal est inaccessible.
+        """
+        directions = self.flow_field(goal).ravel()
+        table = self.get_adjacency().table
+        cell, goal_id = self.cell_id(*start), self.cell_id(*goal)
+        path = [start]
+        while cell != goal_id:
+            k = directions[cell]
+            if k < 0:
+                return []
+            cell = int(table[cell, k])
+            path.append(self.cell_coords(cell))
+        return path
+
+    def dijkstra_from(self, source: Coords, targets: List[Coords]) -> Tuple[Dict[Coords, float], np.ndarray]:
+        """
+        Dijkstra "un vers plusieurs" : une seule recherche depuis `source`, arrêtée dès que toutes les
+        cibles sont atteintes.
+        Retourne le coût de chaque cible accessible et l'arbre des prédécesseurs (tableau de parents,
+        -1 si non atteint) à passer à path_from_tree pour obtenir les chemins.
+        """
+        source_id = self.cell_id(*source)
+        came_from, cost_so_far = self._search(source_id, {self.cell_id(*t) for t in targets})
+        costs = {}
+        for target in targets:
+            cost = cost_so_far[self.cell_id(*target)]
+            if cost < float("inf"):
+                costs[target] = cost
+        return costs, np.array(came_from, dtype=np.int32)
+
+    def path_from_tree(self, tree: np.ndarray, source: Coords, target: Coords) -> List[Coords]:
+        """Reconstruit le chemin source -> target dans un arbre de prédécesseurs issu de dijkstra_from."""
+        source_id, target_id = self.cell_id(*source), self.cell_id(*target)
+        if source_id != target_id and tree[target_id] < 0:
+            return []
+        return self._rebuild_path(tree, source_id, target_id)
+
+    @staticmethod
+    def _tree_roots(tree: np.ndarray, costs: np.ndarray) -> np.ndarray:
+        """
+        Racine (case de départ) de chaque case dans un arbre de prédécesseurs, -1 si la case n'est pas atteinte.
+        Calcul par sauts de pointeurs : O(log profondeur) opérations sur tout le tableau.
+        """
+        roots = np.where(tree >= 0, tree, np.arange(len(tree)))
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                break
+            roots = jumped
+        return np.where(np.isfinite(costs), roots, -1)
+
+    def city_distance_matrix(self, cities: List[Coords]) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Calcule la matrice des coûts entre villes avec n recherches "un vers plusieurs" au lieu de n² recherches.
+        matrix[i, j] est le coût du trajet cities[i] -> cities[j] (inf si inaccessible), trees[i] l'arbre
+        des prédécesseurs depuis cities[i].
+        Les résultats sont conservés pour la version courante de la carte : un nouvel appel sur les mêmes villes
+        (routes, tournée du marchand, ...) ne relance aucune recherche.
+        """
+        if self.__city_routes is None or self.__city_routes["version"] != self.__version:
+            self.__city_routes = {"version": self.__version, "costs": {}, "trees": {}}
+        known_costs, known_trees = self.__city_routes["costs"], self.__city_routes["trees"]
+
+        matrix = np.full((len(cities), len(cities)), np.inf)
+        trees = []
+        for i, city in enumerate(cities):
+            if any((city, other) not in known_costs for other in cities):
+                #Nouvelle recherche depuis cette ville, vers les anciennes cibles et les nouvelles
+                targets = list(dict.fromkeys([b for a, b in known_costs if a == city] + list(cities)))
+                costs, known_trees[city] = self.dijkstra_from(city, targets)
+                for other in targets:
+                    known_costs[(city, other)] = costs.get(other, np.inf)
+            for j, other in enumerate(cities):
+                matrix[i, j] = known_costs[(city, other)]
+            trees.append(known_trees[city])
+        return matrix, trees
 
     def place_cities_and_compare_roads(self, nb_cities: int):
         """
@@ -626,35 +1395,35 @@ class HexGridViewer:
         for x, y in villes:
             self.add_symbol(x, y, Circle(color="darkred", edgecolor="white"))
 
+        #Matrice des coûts entre toutes les villes : une recherche par ville
+        matrix, trees = self.city_distance_matrix(villes)
+
         #ROUTES NOIRES : Dijkstra "local" entre villes successives
         #On relie la ville 0 à 1, 1 à 2, etc.
         for i in range(len(villes) - 1):
-            path_dijkstra = self.find_path_smart(villes[i], villes[i+1])
+            path_dijkstra = self.path_from_tree(trees[i], villes[i], villes[i+1])
             if path_dijkstra:
                 for k in range(len(path_dijkstra)-1):
                     self.add_link(path_dijkstra[k], path_dijkstra[k+1], color="black", thick=1)
 
         #ROUTES ROUGES : Kruskal pour le réseau minimal global
-        #On calcule d'abord tous les chemins possibles entre chaque ville
+        #Les arêtes sont directement lues dans la matrice des coûts
         all_edges = []
         for i in range(len(villes)):
             for j in range(i + 1, len(villes)):
-                path = self.find_path_smart(villes[i], villes[j])
-                if path:
-                    #Calcul du coût total selon terrain + altitude
-                    cost = sum(self.get_movement_cost(path[k], path[k+1]) for k in range(len(path)-1))
-                    all_edges.append((cost, villes[i], villes[j], path))
+                if matrix[i, j] < np.inf:
+                    all_edges.append((matrix[i, j], villes[i], villes[j], i, j))
 
         #Tri par coût croissant (Glouton)
         all_edges.sort()
-        parent = {v: v for v in villes}
+        ensembles = DisjointSet(len(villes))
         routes_mst = 0
         
-        for cost, u, v, path in all_edges:
-            #Si u et v ne sont pas encore connectés (Kruskal)
-            if self.find_set(parent, u) != self.find_set(parent, v):
-                self.union_sets(parent, u, v)
+        for cost, u, v, i, j in all_edges:
+            #Si u et v ne sont pas encore connectés (Kruskal), on les réunit
+            if ensembles.union(i, j):
                 #On trace l'abre recouvrant de poids minimal en rouge et plus épais
+                path = self.path_from_tree(trees[i], u, v)
                 for k in range(len(path)-1):
                     self.add_link(path[k], path[k+1], color="red", thick=1)
                 routes_mst += 1
@@ -663,15 +1432,100 @@ class HexGridViewer:
             if routes_mst == nb_cities - 1:
                 break
 
-    def generate_merchant_tour(self, nb_cities: int):
-        """Tour du marchant en se basant sur Dijsktra et un algorithme glouton"""
+    def steiner_roads(self, cities: List[Coords]) -> List[Tuple[Coords, Coords]]:
+        """
+        Réseau routier reliant les villes : approximation de l'arbre de Steiner (méthode de Mehlhorn, au plus
+        2 fois le réseau optimal), en temps quasi linéaire au lieu de la clôture métrique en n² chemins.
+
+        - un Dijkstra multi-sources partage la terre en régions de Voronoï (la ville la plus proche de chaque case)
+        - chaque paire de cases voisines de deux régions différentes donne un "pont" entre ces deux villes,
+          de coût dist(u) + get_movement_cost(u, v) + dist(v) ; on garde le moins cher par paire de villes
+        - Kruskal sur ces ponts, puis chaque pont retenu est déplié en chemins vers les deux villes.
+        Les chemins d'une même région suivent le même arbre : les routes se partagent les cases communes.
+        Retourne la liste des liens (case, case voisine) du réseau, sans doublon.
+        """
+        ids = list(dict.fromkeys(self.cell_id(*c) for c in cities))
+        if len(ids) < 2:
+            return []
+        base, alt, blocked = (np.asarray(a) for a in self._routing_arrays())
+        came_from, cost_so_far = self._search(ids, None)
+        tree = np.array(came_from, dtype=np.int32)
+        dist = np.array(cost_so_far)
+        region = self._tree_roots(tree, dist)
+
+        #Ponts entre régions (deux cases voisines atteintes, de régions différentes)
+        table = self.get_adjacency().table
+        u = np.repeat(np.arange(len(table)), 6)
+        v = table.ravel()
+        keep = v >= 0
+        u, v = u[keep], v[keep]
+        keep = (region[u] >= 0) & (region[v] >= 0) & (region[u] < region[v]) & ~blocked[v]
+        u, v = u[keep], v[keep]
+        weight = dist[u] + base[v] + np.abs(alt[v] - alt[u]) * 0.5 + dist[v]
+
+        #Le pont le moins cher pour chaque paire de villes, par coût croissant
+        order = np.lexsort((weight, region[v], region[u]))
+        u, v, weight = u[order], v[order], weight[order]
+        first = np.ones(len(u), dtype=bool)
+        first[1:] = (region[u][1:] != region[u][:-1]) | (region[v][1:] != region[v][:-1])
+        u, v, weight = u[first], v[first], weight[first]
+        order = np.argsort(weight, kind="stable")
+
+        #Kruskal sur les villes
+        index = {cell: i for i, cell in enumerate(ids)}
+        ensembles = DisjointSet(len(ids))
+        links = []
+        added = set()
+        for k in order:
+            a, b = int(u[k]), int(v[k])
+            if not ensembles.union(index[int(region[a])], index[int(region[b])]):
+                continue
+            links.append((self.cell_coords(a), self.cell_coords(b)))
+            #On déplie le pont jusqu'aux deux villes (en s'arrêtant sur une route déjà tracée)
+            for cell in (a, b):
+                while tree[cell] >= 0 and cell not in added:
+                    added.add(cell)
+                    links.append((self.cell_coords(int(tree[cell])), self.cell_coords(cell)))
+                    cell = int(tree[cell])
+            if ensembles.count == 1:
+                break
+        return links
+
+    def generate_road_network(self, nb_cities: int) -> Dict[str, float]:
+        """
+        Place nb_cities villes sur la terre ferme et les relie par un réseau routier partagé (steiner_roads),
+        tracé en marron. Retourne le nombre de liens et le coût total du réseau.
+        """
+        terres_fermes = [c for c in self.get_all_coords() if self.get_terrain(c[0], c[1]) != "eau"
+                         and self.get_color(c[0], c[1]) != "dodgerblue"]
+        if len(terres_fermes) < nb_cities:
+            return {}
+
+        villes = random.sample(terres_fermes, nb_cities)
+        for x, y in villes:
+            self.add_symbol(x, y, Circle(color="darkred", edgecolor="white"))
+
+        routes = self.steiner_roads(villes)
+        for a, b in routes:
+            self.add_link(a, b, color="saddlebrown", thick=2)
+        return {"links": len(routes), "cost": sum(self.get_movement_cost(a, b) for a, b in routes)}
+
+    def generate_merchant_tour(self, nb_cities: int, optimize: bool = True, time_budget: float = 1.0,
+                               max_exact_cities: int = 16) -> Dict[str, float]:
+        """
+        Tour du marchant en se basant sur Dijsktra et un algorithme glouton (plus proche voisin).
+        Jusqu'à max_exact_cities villes, la tournée est remplacée par la tournée optimale (solve_tour_exact,
+        mémoire en 2^n) ; au-delà elle est améliorée par 2-opt / Or-opt (optimize_tour) pendant au plus
+        time_budget secondes.
+        Retourne le coût de la tournée avant et après amélioration et la méthode utilisée.
+        """
         
         #Sélection des villes (uniquement sur terre ferme)
         all_coords = self.get_all_coords()
         terres_fermes = [c for c in all_coords if self.get_terrain(c[0], c[1]) != "eau" 
                          and self.get_color(c[0], c[1]) != "dodgerblue"]
         
-        if len(terres_fermes) < nb_cities: return
+        if len(terres_fermes) < nb_cities: return {}
         
         cities = random.sample(terres_fermes, nb_cities)
         ville_depart = cities[0]
@@ -683,42 +1537,133 @@ class HexGridViewer:
                 # Autres villes en doré
                 self.add_symbol(ville[0], ville[1], Circle(color="gold", edgecolor="black"))
 
-        #Logique du parcours
-        villes_a_visiter = cities.copy()
-        ville_actuelle = villes_a_visiter.pop(0)
+        #Logique du parcours : coûts et chemins lus dans la matrice des villes (une recherche par ville)
+        matrix, trees = self.city_distance_matrix(cities)
+        villes_a_visiter = list(range(1, len(cities)))
+        tournee = [0]
 
         while villes_a_visiter:
             # On cherche la ville la plus proche de notre position actuelle
             prochaine_ville = None
-            meilleur_chemin = []
             distance_min = float('inf')
 
             for ville in villes_a_visiter:
-                chemin = self.find_path_smart(ville_actuelle, ville)
-                if chemin:
-                    # On calcule le "poids" du chemin via ta fonction de coût
-                    cout = sum(self.get_movement_cost(chemin[k], chemin[k+1]) for k in range(len(chemin)-1))
-                    if cout < distance_min:
-                        distance_min = cout
-                        prochaine_ville = ville
-                        meilleur_chemin = chemin
-
-            # Si on a trouvé une ville accessible, on trace le lien
-            if prochaine_ville:
-                for k in range(len(meilleur_chemin)-1):
-                    # On trace en vert pour bien distinguer le parcours du marchand
-                    self.add_link(meilleur_chemin[k], meilleur_chemin[k+1], color="gold", thick=2)
-                
-                # On se déplace vers cette ville
-                ville_actuelle = prochaine_ville
-                villes_a_visiter.remove(prochaine_ville)
-
-        #LE RETOUR : On boucle vers la ville de départ
-        chemin_retour = self.find_path_smart(ville_actuelle, ville_depart)
-        if chemin_retour:
-            for k in range(len(chemin_retour)-1):
-                self.add_link(chemin_retour[k], chemin_retour[k+1], color="gold", thick=2)
+                if matrix[tournee[-1], ville] < distance_min:
+                    distance_min = matrix[tournee[-1], ville]
+                    prochaine_ville = ville
 
+            if prochaine_ville is None:
+                # Aucune ville restante n'est accessible (île) : on arrête le parcours
+                break
+            # On se déplace vers cette ville
+            tournee.append(prochaine_ville)
+            villes_a_visiter.remove(prochaine_ville)
+
+        #Amélioration de la tournée (seulement si toutes les villes ont été atteintes)
+        cout_avant = cout_apres = tour_cost(matrix, tournee)
+        methode = "greedy"
+        if optimize and not villes_a_visiter:
+            if len(cities) <= max_exact_cities:
+                tournee, cout_apres = solve_tour_exact(matrix)
+                methode = "held-karp"
+            else:
+                tournee, cout_avant, cout_apres = optimize_tour(matrix, tournee, time_budget=time_budget)
+                methode = "2-opt"
+
+        #On trace en doré le parcours du marchand, retour à la ville de départ compris
+        for k in range(len(tournee)):
+            depart, arrivee = tournee[k], tournee[(k + 1) % len(tournee)]
+            chemin = self.path_from_tree(trees[depart], cities[depart], cities[arrivee])
+            for m in range(len(chemin)-1):
+                self.add_link(chemin[m], chemin[m+1], color="gold", thick=2)
+
+        return {"cost_before": cout_avant, "cost_after": cout_apres, "method": methode}
+
+
+    def save(self, path: str) -> None:
+        """
+        Sauvegarde la carte (altitudes, codes de terrain, opacités, couleurs, symboles et liens)
+        dans un fichier binaire versionné, relisible via HexGridViewer.load.
+        """
+        layers = {
+            "altitude": self.__altitude.astype("<f8", copy=False),
+            "terrain": self.__terrain.astype("u1", copy=False),
+            "alpha": self.__alpha.astype("<f8", copy=False),
+            "colors": self.__colors.astype("<u2", copy=False),
+        }
+        symbols = [[x, y, type(forme).__name__, forme._color, forme._edgecolor]
+                   for (x, y), forme in self.__symbols.items() if forme is not None]
+        links = [[c1[0], c1[1], c2[0], c2[1], color, thick] for c1, c2, color, thick in self.__links]
+
+        #Position de chaque tableau : elle dépend de la taille de l'en-tête, qui contient ces positions.
+        #On recommence tant que la taille de l'en-tête change (elle ne peut que croître : ça s'arrête vite)
+        header = {"width": self.__width, "height": self.__height, "palette": self.__palette,
+                  "terrain_names": list(TERRAIN_NAMES), "symbols": symbols, "links": links, "arrays": {}}
+        header_bytes = json.dumps(header).encode("utf-8")
+        while True:
+            offset = len(MAP_MAGIC) + 8 + len(header_bytes)
+            for name, layer in layers.items():
+                offset += -offset % MAP_ALIGNMENT
+                header["arrays"][name] = {"dtype": layer.dtype.str, "offset": offset}
+                offset += layer.nbytes
+            new_bytes = json.dumps(header).encode("utf-8")
+            if len(new_bytes) == len(header_bytes):
+                header_bytes = new_bytes
+                break
+            header_bytes = new_bytes
+
+        with open(path, "wb") as f:
+            f.write(MAP_MAGIC)
+            f.write(struct.pack("<II", MAP_FORMAT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for name, layer in layers.items():
+                padding = header["arrays"][name]["offset"] - f.tell()
+                assert padding >= 0, f"array {name} would overlap the previous data"
+                f.write(b"\x00" * padding)
+                f.write(np.ascontiguousarray(layer).tobytes())
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> HexGridViewer:
+        """
+        Recharge une carte sauvegardée via save.
+        :param mmap: si vrai, les couches numériques sont projetées en mémoire (copie à l'écriture) :
+        l'ouverture est quasi instantanée quelle que soit la taille, les données sont lues à la demande.
+        """
+        with open(path, "rb") as f:
+            magic = f.read(len(MAP_MAGIC))
+            assert magic == MAP_MAGIC, f"{path} is not a saved hexagonal map"
+            version, header_size = struct.unpack("<II", f.read(8))
+            assert version == MAP_FORMAT_VERSION, f"unsupported map format version {version}"
+            header = json.loads(f.read(header_size).decode("utf-8"))
+
+        width, height = header["width"], header["height"]
+        layers = {}
+        for name, info in header["arrays"].items():
+            if mmap:
+                layers[name] = np.memmap(path, dtype=info["dtype"], mode="c", offset=info["offset"], shape=(height, width))
+            else:
+                layers[name] = np.fromfile(path, dtype=info["dtype"], count=width * height,
+                                           offset=info["offset"]).reshape(height, width)
+
+        grid = cls(0, 0)
+        grid.__width, grid.__height = width, height
+        grid.__altitude = layers["altitude"]
+        grid.__alpha = layers["alpha"]
+        grid.__colors = layers["colors"]
+        grid.__terrain = layers["terrain"]
+        if tuple(header["terrain_names"]) != TERRAIN_NAMES:
+            #Fichier dont les codes de terrain ne suivent pas TERRAIN_NAMES : conversion des codes
+            remap = np.array([TERRAIN_CODES[name] for name in header["terrain_names"]], dtype=np.uint8)
+            grid.__terrain = remap[grid.__terrain]
+        grid.__palette = list(header["palette"])
+        grid.__palette_index = {color: code for code, color in enumerate(grid.__palette)}
+
+        formes = {"Rect": Rect, "Circle": Circle}
+        for x, y, kind, color, edgecolor in header["symbols"]:
+            grid.__symbols[(x, y)] = formes[kind](color=color, edgecolor=edgecolor)
+        grid.__links = [((x1, y1), (x2, y2), color, thick) for x1, y1, x2, y2, color, thick in header["links"]]
+        grid.mark_modified()
+        return grid
 
     def show(self, alias: Dict[str, str] = None, debug_coords: bool = False) -> None:
         """
@@ -739,60 +1684,58 @@ class HexGridViewer:
         ax.set_aspect('equal')
 
         h = self.__hexsize
-        coords = {}
-        for row in range(self.__height):
-            for col in range(self.__width):
-                x = col * 1.5 * h #1,5 fois la taille * la hauteur de 10
-                y = row * np.sqrt(3) * h #racine de 3 fois la colonne
-
-                #Colonne impaire
-                if col % 2 == 1:
-                    #Ajout d'un petit décalage pour faire une grille hexgonale
-                    y += np.sqrt(3) * h / 2
-
-                #Association colonnes et coordonnées 
-                coords[(row, col)] = (x, y)
-
-                #Définition du centre
-                center = (x, y)
-
-                #Création du polygone = hexagone en radian
-                hexagon = RegularPolygon(center, numVertices=6, radius=h, orientation=np.pi / 6, edgecolor="black")
-
-                #Mettre les couleurs en fonction de celle prédéfini
-                hexagon.set_facecolor(self.__colors[(row, col)])
 
-                #De même pour le alpha
-                hexagon.set_alpha(self.__alpha[(row, col)])
-
-                # Ajoute du texte à l'hexagone
-                if debug_coords:
-                    text = f"({row}, {col})"  # Le texte que vous voulez afficher
-                    ax.annotate(text, xy=center, ha='center', va='center', fontsize=6, color='black')
-
-                # ajoute l'hexagone
-                ax.add_patch(hexagon)
-
-                # gestion des Formes additionnelles
-                forme = self.__symbols[(row, col)]
-                if forme is not None:
-                    ax.add_patch(forme.get(x, y, h))
-
-        for coord1, coord2, color, thick in self.__links:
-            #Vérifié si deux cases ne sont pas déja connecté
-            if coord1 not in coords or coord2 not in coords:
+        #Centres de toutes les cases, calculés en une passe. La case (x, y) est affichée
+        #ligne x, colonne y : les colonnes impaires sont décalées d'une demi-case vers le haut
+        ys, xs = np.indices((self.__height, self.__width))
+        centers = np.empty((self.__height, self.__width, 2))
+        centers[..., 0] = ys * 1.5 * h #1,5 fois la taille * la hauteur de 10
+        centers[..., 1] = xs * np.sqrt(3) * h + (ys % 2) * np.sqrt(3) * h / 2 #racine de 3 fois la ligne
+
+        #Sommets des hexagones (à plat, pointes à gauche et à droite) : forme (N, 6, 2)
+        angles = np.arange(6) * np.pi / 3
+        corners = h * np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        vertices = centers.reshape(-1, 1, 2) + corners
+
+        #Couleurs RGBA par case : couleur de la palette, opacité de la couche alpha (bordure comprise)
+        facecolors = mcolors.to_rgba_array(self.__palette)[self.__colors.ravel()]
+        facecolors[:, 3] = self.__alpha.ravel()
+        edgecolors = np.zeros_like(facecolors)
+        edgecolors[:, 3] = facecolors[:, 3]
+
+        #Tous les hexagones forment une seule collection
+        ax.add_collection(PolyCollection(vertices, facecolors=facecolors, edgecolors=edgecolors, linewidths=1.0))
+
+        # Ajoute du texte à l'hexagone
+        if debug_coords:
+            for (y, x), center in zip(np.ndindex(self.__height, self.__width), centers.reshape(-1, 2)):
+                text = f"({x}, {y})"  # Le texte que vous voulez afficher
+                ax.annotate(text, xy=tuple(center), ha='center', va='center', fontsize=6, color='black')
+
+        # gestion des Formes additionnelles, regroupées dans une seule collection
+        formes = [forme.get(*centers[y, x], h) for (x, y), forme in self.__symbols.items()
+                  if forme is not None and 0 <= x < self.__width and 0 <= y < self.__height]
+        if formes:
+            ax.add_collection(PatchCollection(formes, match_original=True))
+
+        #Liaisons entre cases, regroupées dans une seule collection
+        segments, link_colors, link_widths = [], [], []
+        for (x1, y1), (x2, y2), color, thick in self.__links:
+            #Vérifié que les deux cases sont bien dans la grille
+            if not (0 <= x1 < self.__width and 0 <= y1 < self.__height and 0 <= x2 < self.__width and 0 <= y2 < self.__height):
                 continue
-            x1, y1 = coords[coord1]
-            x2, y2 = coords[coord2]
-            #Liaison entre deux case
-            plt.gca().add_line(plt.Line2D([x1, x2], [y1, y2], color=color, linewidth=thick))
-
-        ax.set_xlim(-h, self.__width * 1.5 * h + h)
-        ax.set_ylim(-h, self.__height * np.sqrt(3) * h + h)
+            segments.append((centers[y1, x1], centers[y2, x2]))
+            link_colors.append(color)
+            link_widths.append(thick)
+        if segments:
+            ax.add_collection(LineCollection(segments, colors=link_colors, linewidths=link_widths, zorder=2))
+
+        ax.set_xlim(-h, self.__height * 1.5 * h + h)
+        ax.set_ylim(-h, self.__width * np.sqrt(3) * h + h)
         ax.axis('off')
 
         ks, vs = [], []
-        for color in set(self.__colors.values()):
+        for color in [self.__palette[code] for code in np.unique(self.__colors)]:
             if color in alias:
                 ks.append(alias[color])
             else:
@@ -816,6 +1759,674 @@ class HexGridViewer:
 
 
 
+class ContractionHierarchy:
+    """
+    Hiérarchie de contraction construite sur le graphe pondéré d'une HexGridViewer, pour répondre très vite
+    aux requêtes répétées entre cases fixes (villes) sur une carte qui ne change plus.
+
+    Le graphe est celui de find_path_smart : les cases d'eau ou de rivière en sont exclues, et le coût de
+    l'arc c -> n vaut celui de get_movement_cost. Les cases sont "contractées" une par une (ordre choisi par
+    la différence d'arêtes) : des raccourcis préservent les plus courts chemins entre les cases restantes.
+    Une requête est une recherche bidirectionnelle qui ne monte que vers des cases de rang supérieur ; les
+    raccourcis du chemin trouvé sont ensuite dépliés pour retrouver les cases traversées.
+
+    L'index se sauvegarde (save) et se recharge (load) sans la grille.
+    """
+
+    def __init__(self, grid: HexGridViewer = None, witness_limit: int = 64):
+        """
+        Construit l'index pour `grid`.
+        :param witness_limit: nombre maximal de cases explorées par recherche de témoin lors de la contraction.
+        Une limite basse ajoute des raccourcis inutiles mais ne change pas les résultats.
+        """
+        self.__width = self.__height = 0
+        self.__version = -1
+        # rang de chaque case dans l'ordre de contraction (-1 : case hors du graphe)
+        self.__rank: List[int] = []
+        # arcs montants : up_out[u] = {w: coût} avec rang(w) > rang(u), up_in[w] = {u: coût} avec rang(u) > rang(w)
+        self.__up_out: List[Dict[int, float]] = []
+        self.__up_in: List[Dict[int, float]] = []
+        # case contractée que contourne chaque raccourci (u, w)
+        self.__middle: Dict[Tuple[int, int], int] = {}
+        if grid is not None:
+            self.__build(grid, witness_limit)
+
+    def get_version(self) -> int:
+        """Retourne la version de la carte pour laquelle l'index a été construit (voir get_map_version)."""
+        return self.__version
+
+    def __build(self, grid: HexGridViewer, witness_limit: int) -> None:
+        """Contracte toutes les cases terrestres de la grille."""
+        self.__width, self.__height = grid.get_width(), grid.get_height()
+        self.__version = grid.get_map_version()
+        neighbours = grid.get_adjacency().get_lists()
+        base, alt, blocked = grid._routing_arrays()
+        size = len(neighbours)
+
+        #Graphe restant (arcs entre cases non encore contractées)
+        out_edges: List[Dict[int, float]] = [{} for _ in range(size)]
+        in_edges: List[Dict[int, float]] = [{} for _ in range(size)]
+        nodes = [c for c in range(size) if not blocked[c]]
+        for c in nodes:
+            for n in neighbours[c]:
+                if not blocked[n]:
+                    cost = base[n] + abs(alt[n] - alt[c]) * 0.5
+                    out_edges[c][n] = cost
+                    in_edges[n][c] = cost
+
+        def witness_costs(source: int, excluded: int, limit: float) -> Dict[int, float]:
+            """Dijkstra limité depuis `source` dans le graphe restant, sans passer par `excluded`."""
+            dist = {source: 0.0}
+            heap = [(0.0, source)]
+            settled = 0
+            while heap and settled < witness_limit:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                if d > limit:
+                    break
+                settled += 1
+                for w, c in out_edges[u].items():
+                    if w == excluded:
+                        continue
+                    nd = d + c
+                    if nd < dist.get(w, float("inf")):
+                        dist[w] = nd
+                        heapq.heappush(heap, (nd, w))
+            return dist
+
+        def shortcuts(v: int) -> List[Tuple[int, int, float]]:
+            """Raccourcis nécessaires pour contracter `v` : u -> v -> w sans chemin témoin au plus aussi court."""
+            ins, outs = in_edges[v], out_edges[v]
+            result = []
+            if not ins or not outs:
+                return result
+            max_out = max(outs.values())
+            for u, cost_in in ins.items():
+                dist = witness_costs(u, v, cost_in + max_out)
+                for w, cost_out in outs.items():
+                    if w != u and dist.get(w, float("inf")) > cost_in + cost_out:
+                        result.append((u, w, cost_in + cost_out))
+            return result
+
+        contracted_neighbours = [0] * size
+
+        def priority(v: int, added: List[Tuple[int, int, float]]) -> int:
+            """Différence d'arêtes : raccourcis ajoutés - arcs supprimés, + voisins déjà contractés."""
+            return len(added) - len(in_edges[v]) - len(out_edges[v]) + contracted_neighbours[v]
+
+        self.__rank = [-1] * size
+        self.__up_out = [{} for _ in range(size)]
+        self.__up_in = [{} for _ in range(size)]
+        self.__middle = {}
+
+        heap = [(priority(v, shortcuts(v)), v) for v in nodes]
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            #Mise à jour paresseuse : si la priorité a augmenté, on remet la case dans la file
+            added = shortcuts(v)
+            current = priority(v, added)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, v))
+                continue
+
+            for u, w, cost in added:
+                if cost < out_edges[u].get(w, float("inf")):
+                    out_edges[u][w] = cost
+                    in_edges[w][u] = cost
+                    self.__middle[(u, w)] = v
+
+            #Les arcs restants de v mènent à des cases contractées plus tard : ce sont ses arcs montants
+            self.__rank[v] = order
+            order += 1
+            self.__up_out[v] = out_edges[v]
+            self.__up_in[v] = in_edges[v]
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                contracted_neighbours[w] += 1
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                contracted_neighbours[u] += 1
+            out_edges[v], in_edges[v] = {}, {}
+
+    def query(self, start: Coords, goal: Coords) -> Tuple[float, List[Coords]]:
+        """
+        Retourne le coût et le chemin (liste de coordonnées) de `start` à `goal`, comme find_path_smart.
+        (inf, []) si goal est inaccessible ou si une extrémité n'appartient pas au graphe (eau, rivière).
+        """
+        s = start[1] * self.__width + start[0]
+        t = goal[1] * self.__width + goal[0]
+        if self.__rank[s] < 0 or self.__rank[t] < 0:
+            return float("inf"), []
+        if s == t:
+            return 0.0, [start]
+
+        #Recherches montantes depuis start (arcs sortants) et depuis goal (arcs entrants), en alternance
+        dist = ({s: 0.0}, {t: 0.0})
+        parent = ({s: -1}, {t: -1})
+        heaps = ([(0.0, s)], [(0.0, t)])
+        edges = (self.__up_out, self.__up_in)
+        best, meeting = float("inf"), -1
+        side = 0
+        while heaps[0] or heaps[1]:
+            if not heaps[side] or heaps[side][0][0] >= best:
+                side = 1 - side
+                if not heaps[side] or heaps[side][0][0] >= best:
+                    break
+            d, u = heapq.heappop(heaps[side])
+            if d > dist[side][u]:
+                continue
+            other = dist[1 - side].get(u)
+            if other is not None and d + other < best:
+                best, meeting = d + other, u
+            for w, c in edges[side][u].items():
+                nd = d + c
+                if nd < dist[side].get(w, float("inf")):
+                    dist[side][w] = nd
+                    parent[side][w] = u
+                    heapq.heappush(heaps[side], (nd, w))
+            side = 1 - side
+
+        if meeting < 0:
+            return float("inf"), []
+
+        #Chemin dans la hiérarchie : start -> meeting (parents avant) puis meeting -> goal (parents arrière)
+        hops = [meeting]
+        while parent[0][hops[-1]] >= 0:
+            hops.append(parent[0][hops[-1]])
+        hops.reverse()
+        while parent[1][hops[-1]] >= 0:
+            hops.append(parent[1][hops[-1]])
+
+        cells = [hops[0]]
+        for u, w in zip(hops, hops[1:]):
+            cells.extend(self.__unpack(u, w))
+        return best, [(c % self.__width, c // self.__width) for c in cells]
+
+    def __unpack(self, u: int, w: int) -> List[int]:
+        """Déplie l'arc (éventuellement raccourci) u -> w : cases traversées après u, jusqu'à w compris."""
+        cells = []
+        stack = [(u, w)]
+        while stack:
+            a, b = stack.pop()
+            middle = self.__middle.get((a, b))
+            if middle is None:
+                cells.append(b)
+            else:
+                #On traite a -> middle avant middle -> b
+                stack.append((middle, b))
+                stack.append((a, middle))
+        return cells
+
+    def save(self, path: str) -> None:
+        """Sauvegarde l'index (format .npz) : rangs des cases et liste des arcs montants avec leur milieu."""
+        src, dst, cost, middle = [], [], [], []
+        for u, edges in enumerate(self.__up_out):
+            for w, c in edges.items():
+                src.append(u); dst.append(w); cost.append(c); middle.append(self.__middle.get((u, w), -1))
+        for w, edges in enumerate(self.__up_in):
+            for u, c in edges.items():
+                src.append(u); dst.append(w); cost.append(c); middle.append(self.__middle.get((u, w), -1))
+        np.savez_compressed(path, shape=np.array([self.__width, self.__height, self.__version]),
+                            rank=np.array(self.__rank, dtype=np.int32), src=np.array(src, dtype=np.int32),
+                            dst=np.array(dst, dtype=np.int32), cost=np.array(cost, dtype=np.float64),
+                            middle=np.array(middle, dtype=np.int32))
+
+    @classmethod
+    def load(cls, path: str) -> ContractionHierarchy:
+        """Recharge un index sauvegardé via save."""
+        data = np.load(path)
+        hierarchy = cls()
+        hierarchy.__width, hierarchy.__height, hierarchy.__version = (int(v) for v in data["shape"])
+        hierarchy.__rank = data["rank"].tolist()
+        size = len(hierarchy.__rank)
+        hierarchy.__up_out = [{} for _ in range(size)]
+        hierarchy.__up_in = [{} for _ in range(size)]
+        rank = hierarchy.__rank
+        for u, w, c, m in zip(data["src"].tolist(), data["dst"].tolist(), data["cost"].tolist(), data["middle"].tolist()):
+            if rank[u] < rank[w]:
+                hierarchy.__up_out[u][w] = c
+            else:
+                hierarchy.__up_in[w][u] = c
+            if m >= 0:
+                hierarchy.__middle[(u, w)] = m
+        return hierarchy
+
+
+
+class HierarchicalPathfinder:
+    """
+    Recherche de chemin hiérarchique (HPA*) sur une HexGridViewer, pour les très grandes cartes.
+
+    La grille est découpée en blocs carrés de `cluster_size` cases. Sur chaque frontière entre deux blocs,
+    les paires de cases voisines franchissables forment des "portes" : une paire au milieu de chaque tronçon
+    continu (ou les deux extrémités si le tronçon est long). Le graphe abstrait relie les portes d'un même
+    bloc (coût précalculé par Dijkstra à l'intérieur du bloc) et les deux cases de chaque porte.
+    Une requête relie le départ et l'arrivée aux portes de leur bloc (et des blocs voisins de leur case),
+    cherche dans le graphe abstrait (A*), puis raffine : un A* exact limité au couloir des blocs traversés
+    par le chemin abstrait donne le chemin final, sans les détours imposés par le passage aux portes.
+
+    Le chemin obtenu est proche de l'optimal mais pas forcément optimal : chaque requête fournit, via
+    get_last_report, une borne de sous-optimalité (coût trouvé / borne inférieure admissible). La borne
+    inférieure vient du raffinement (voir __refine) et utilise les repères ALT de la grille s'ils sont à jour
+    (HexGridViewer.build_landmarks) : sans repères, elle reste correcte mais beaucoup moins serrée.
+    Après une modification de la carte, update_cells ne reconstruit que les blocs touchés.
+    """
+
+    def __init__(self, grid: HexGridViewer, cluster_size: int = 16, max_run: int = 6):
+        """
+        :param cluster_size: côté des blocs (en cases)
+        :param max_run: longueur au-delà de laquelle un tronçon de frontière reçoit deux portes au lieu d'une
+        """
+        self.__grid = grid
+        self.__cluster_size = cluster_size
+        self.__max_run = max_run
+        width, height = grid.get_width(), grid.get_height()
+        self.__width = width
+        self.__neighbours = grid.get_adjacency().get_lists()
+
+        #Bloc de chaque case
+        clusters_x = -(-width // cluster_size)
+        clusters_y = -(-height // cluster_size)
+        ys, xs = np.divmod(np.arange(width * height), width)
+        cluster = (ys // cluster_size) * clusters_x + xs // cluster_size
+        self.__cluster: List[int] = cluster.tolist()
+        order = np.argsort(cluster, kind="stable")
+        bounds = np.searchsorted(cluster[order], np.arange(clusters_x * clusters_y + 1))
+        self.__members = [order[bounds[c]:bounds[c + 1]].tolist() for c in range(clusters_x * clusters_y)]
+
+        # portes de chaque frontière (bloc A < bloc B) : paires (case de A, case de B)
+        self.__borders: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        self.__cluster_borders: List[set] = [set() for _ in self.__members]
+        # cases-portes de chaque bloc, arcs entre les deux cases d'une porte, arcs internes à un bloc
+        self.__entrances: List[set] = [set() for _ in self.__members]
+        self.__inter: Dict[int, Dict[int, float]] = defaultdict(dict)
+        self.__intra: List[Dict[int, Dict[int, float]]] = [{} for _ in self.__members]
+        self.__report: Dict[str, float] = {}
+
+        self.__refresh_costs()
+        for border, pairs in self.__find_entrances(range(width * height)).items():
+            self.__set_border(border, pairs)
+        for c in range(len(self.__members)):
+            self.__build_intra(c)
+
+    def get_last_report(self) -> Dict[str, float]:
+        """
+        Rapport de la dernière requête : coût trouvé, borne inférieure admissible du coût optimal,
+        borne de sous-optimalité (coût / borne inférieure) et nombre de nœuds abstraits développés.
+        """
+        return dict(self.__report)
+
+    def __refresh_costs(self) -> None:
+        """Relit les coûts de la grille (terrain, altitude, cases interdites)."""
+        self.__base, self.__alt, self.__blocked = self.__grid._routing_arrays()
+
+    def __find_entrances(self, cells) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+        """Portes de toutes les frontières touchant les cases `cells` (liste vide si la frontière est fermée)."""
+        cluster, blocked, neighbours = self.__cluster, self.__blocked, self.__neighbours
+        candidates: Dict[Tuple[int, int], set] = defaultdict(set)
+        for u in cells:
+            for v in neighbours[u]:
+                if cluster[u] == cluster[v]:
+                    continue
+                a, b = (u, v) if cluster[u] < cluster[v] else (v, u)
+                pairs = candidates[(cluster[a], cluster[b])]
+                if not blocked[a] and not blocked[b]:
+                    pairs.add((a, b))
+
+        entrances = {}
+        for border, pairs in candidates.items():
+            chosen = []
+            #Tronçons continus : paires consécutives dont les cases se touchent (ou sont les mêmes)
+            run = []
+            for pair in sorted(pairs):
+                if run and not (pair[0] == run[-1][0] or pair[0] in neighbours[run[-1][0]]
+                                or pair[1] == run[-1][1] or pair[1] in neighbours[run[-1][1]]):
+                    chosen.extend(self.__pick(run))
+                    run = []
+                run.append(pair)
+            if run:
+                chosen.extend(self.__pick(run))
+            entrances[border] = chosen
+        return entrances
+
+    def __pick(self, run: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Portes retenues pour un tronçon de frontière."""
+        if len(run) > self.__max_run:
+            return [run[0], run[-1]]
+        return [run[len(run) // 2]]
+
+    def __set_border(self, border: Tuple[int, int], pairs: List[Tuple[int, int]]) -> None:
+        """Remplace les portes d'une frontière et met à jour les cases-portes des deux blocs."""
+        for a, b in self.__borders.get(border, []):
+            self.__inter[a].pop(b, None)
+            self.__inter[b].pop(a, None)
+        self.__borders[border] = pairs
+        base, alt = self.__base, self.__alt
+        for a, b in pairs:
+            self.__inter[a][b] = base[b] + abs(alt[b] - alt[a]) * 0.5
+            self.__inter[b][a] = base[a] + abs(alt[a] - alt[b]) * 0.5
+
+        for c in border:
+            self.__cluster_borders[c].add(border)
+            self.__entrances[c] = {pair[0] if other[0] == c else pair[1]
+                                   for other in self.__cluster_borders[c] for pair in self.__borders[other]}
+
+    def __build_intra(self, c: int) -> None:
+        """(Re)calcule les coûts entre les portes du bloc `c`."""
+        entrances = self.__entrances[c]
+        self.__intra[c] = {}
+        for e in entrances:
+            dist = self.__local_search(e, {c})
+            self.__intra[c][e] = {f: dist[f] for f in entrances if f != e and f in dist}
+
+    def __local_search(self, source: int, clusters: set, reverse: bool = False) -> Dict[int, float]:
+        """
+        Dijkstra limité aux blocs `clusters` depuis `source` (ou vers `source` si `reverse`).
+        Retourne les coûts des cases atteintes.
+        """
+        base, alt, blocked, cluster, neighbours = self.__base, self.__alt, self.__blocked, self.__cluster, self.__neighbours
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if reverse and blocked[u]:
+                continue
+            for n in neighbours[u]:
+                if cluster[n] not in clusters or blocked[n]:
+                    continue
+                nd = d + (base[u] if reverse else base[n]) + abs(alt[n] - alt[u]) * 0.5
+                if nd < dist.get(n, float("inf")):
+                    dist[n] = nd
+                    heapq.heappush(heap, (nd, n))
+        return dist
+
+    def __refine(self, s: int, t: int, corridor: set, heuristic: Callable[[int], float]) -> Tuple[float, List[int], float]:
+        """
+        A* exact de s à t limité aux blocs `corridor`. Retourne le coût, les cases du chemin (inf, [] si t
+        n'est pas atteint) et une borne inférieure du coût optimal sur toute la grille : un chemin plus court
+        sortirait du couloir par un arc (u, v) et coûterait au moins g(u) + coût(u, v) + heuristic(v) si u a été
+        développée, au moins le coût trouvé sinon (heuristique cohérente).
+        """
+        base, alt, blocked, cluster, neighbours = self.__base, self.__alt, self.__blocked, self.__cluster, self.__neighbours
+        g = {s: 0.0}
+        parent = {s: -1}
+        heap = [(heuristic(s), 0.0, s)]
+        exit_bound = float("inf")
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if d > g[u]:
+                continue
+            if u == t:
+                path = [t]
+                while path[-1] != s:
+                    path.append(parent[path[-1]])
+                return d, path[::-1], min(d, exit_bound)
+            for n in neighbours[u]:
+                if blocked[n]:
+                    continue
+                nd = d + base[n] + abs(alt[n] - alt[u]) * 0.5
+                if cluster[n] not in corridor:
+                    exit_bound = min(exit_bound, nd + heuristic(n))
+                elif nd < g.get(n, float("inf")):
+                    g[n] = nd
+                    parent[n] = u
+                    heapq.heappush(heap, (nd + heuristic(n), nd, n))
+        return float("inf"), [], exit_bound
+
+    def update_cells(self, cells: List[Coords]) -> int:
+        """
+        Prend en compte une modification de la carte sur les cases `cells` (terrain, altitude ou rivière) :
+        seuls les blocs qui les contiennent sont reconstruits, plus les blocs voisins dont les portes ont changé.
+        Retourne le nombre de blocs reconstruits.
+        """
+        self.__refresh_costs()
+        changed = {self.__cluster[y * self.__width + x] for x, y in cells}
+        rebuild = set(changed)
+        for c in changed:
+            for border, pairs in self.__find_entrances(self.__members[c]).items():
+                before = [set(self.__entrances[d]) for d in border]
+                self.__set_border(border, pairs)
+                for d, old in zip(border, before):
+                    if self.__entrances[d] != old:
+                        rebuild.add(d)
+        for c in rebuild:
+            self.__build_intra(c)
+        return len(rebuild)
+
+    def query(self, start: Coords, goal: Coords) -> Tuple[float, List[Coords]]:
+        """
+        Retourne le coût et le chemin (liste de coordonnées) de `start` à `goal`, (inf, []) si inaccessible.
+        Comme find_path_smart, le départ peut être une case interdite mais pas l'arrivée.
+        """
+        grid, width, cluster, neighbours = self.__grid, self.__width, self.__cluster, self.__neighbours
+        s, t = start[1] * width + start[0], goal[1] * width + goal[0]
+        #Blocs de la case et de ses voisines : une case au bord d'un bloc rejoint aussi les portes d'à côté
+        s_clusters = {cluster[s]} | {cluster[n] for n in neighbours[s]}
+        t_clusters = {cluster[t]} | {cluster[n] for n in neighbours[t]}
+        heuristic = grid._landmark_heuristic(s, t, grid._hex_heuristic(goal), rebuild=False)
+
+        self.__report = {"cost": float("inf"), "lower_bound": heuristic(s), "suboptimality_bound": float("inf"),
+                         "abstract_nodes_expanded": 0}
+        if s == t:
+            self.__report.update(cost=0.0, suboptimality_bound=1.0)
+            return 0.0, [start]
+        if self.__blocked[t]:
+            return float("inf"), []
+
+        #Raccordement du départ et de l'arrivée aux portes de leurs blocs
+        start_dist = self.__local_search(s, s_clusters)
+        goal_dist = self.__local_search(t, t_clusters, reverse=True)
+
+        def edges(u: int):
+            """Arcs abstraits sortant de u : (voisin, coût)."""
+            if u == s:
+                for c in s_clusters:
+                    for e in self.__entrances[c]:
+                        if e in start_dist and e != s:
+                            yield e, start_dist[e]
+                if t in start_dist:
+                    yield t, start_dist[t]
+            if u in self.__entrances[cluster[u]]:
+                yield from self.__intra[cluster[u]][u].items()
+                yield from self.__inter[u].items()
+                if u in goal_dist and u != t:
+                    yield t, goal_dist[u]
+
+        #A* dans le graphe abstrait
+        g = {s: 0.0}
+        parent = {s: None}
+        heap = [(heuristic(s), 0.0, s)]
+        expanded = 0
+        while heap:
+            _, cost, u = heapq.heappop(heap)
+            if cost > g[u]:
+                continue
+            expanded += 1
+            if u == t:
+                break
+            for v, c in edges(u):
+                nc = cost + c
+                if nc < g.get(v, float("inf")):
+                    g[v] = nc
+                    parent[v] = u
+                    heapq.heappush(heap, (nc + heuristic(v), nc, v))
+        self.__report["abstract_nodes_expanded"] = expanded
+
+        if t not in g:
+            return float("inf"), []
+
+        #Raffinement : A* exact dans le couloir des blocs traversés par le chemin abstrait
+        corridor = s_clusters | t_clusters
+        v = t
+        while v is not None:
+            corridor.add(cluster[v])
+            v = parent[v]
+        cost, cells, lower = self.__refine(s, t, corridor, heuristic)
+
+        self.__report.update(cost=cost, lower_bound=lower, suboptimality_bound=cost / lower if lower > 0 else 1.0)
+        return cost, [(c % width, c // width) for c in cells]
+
+
+
+class IncrementalRoute:
+    """
+    Itinéraire entre deux cases d'une HexGridViewer, replanifié incrémentalement (D* Lite) quand la carte change.
+
+    La recherche part de l'arrivée (g[u] = coût de u jusqu'à goal) et garde son état entre deux appels.
+    replan(cells) relit dans la grille les seules cases modifiées (comme HierarchicalPathfinder.update_cells) :
+    seuls les sommets dont un arc a changé (ces cases et leurs voisines) sont remis à jour, et la réparation
+    ne parcourt que la zone influencée par la modification au lieu de toute la recherche.
+    Le départ peut avancer le long du chemin (set_start) sans tout recalculer.
+    """
+
+    def __init__(self, grid: HexGridViewer, start: Coords, goal: Coords):
+        self.__grid = grid
+        self.__neighbours = grid.get_adjacency().get_lists()
+        self.__start = grid.cell_id(*start)
+        self.__goal = grid.cell_id(*goal)
+        # heuristique : distance hexagonale jusqu'au départ, multipliée par le plus petit coût de terrain
+        # franchissable de TERRAIN_COSTS (et non de la carte) pour rester valable après toute modification
+        self.__min_cost = float(TERRAIN_COSTS[TERRAIN_PASSABLE].min())
+        self.__heuristic = grid._hex_heuristic(start, self.__min_cost)
+        self.__reset()
+
+    def __reset(self) -> None:
+        """Planification complète depuis l'état de la carte : copie des coûts puis recherche depuis l'arrivée."""
+        n = len(self.__neighbours)
+        self.__km = 0.0
+        self.__g = [float("inf")] * n
+        self.__rhs = [float("inf")] * n
+        self.__queued: Dict[int, Tuple[float, float]] = {}
+        self.__heap: List[Tuple[float, float, int]] = []
+        self.__version = self.__grid.get_map_version()
+        #Copies propres à l'itinéraire : replan ne met à jour que les cases modifiées
+        self.__base, self.__alt, self.__blocked = (values.tolist() for values in self.__grid._routing_values())
+
+        self.__rhs[self.__goal] = 0.0
+        self.__push(self.__goal)
+        self.__compute()
+
+    def get_nodes_expanded(self) -> int:
+        """Nombre de cases développées par la dernière (re)planification, à comparer à HexGridViewer.get_nodes_expanded."""
+        return self.__expanded
+
+    def get_cost(self) -> float:
+        """Coût du chemin courant (inf si l'arrivée est inaccessible)."""
+        return self.__g[self.__start]
+
+    def __key(self, cell: int) -> Tuple[float, float]:
+        best = min(self.__g[cell], self.__rhs[cell])
+        return best + self.__heuristic(cell) + self.__km, best
+
+    def __push(self, cell: int) -> None:
+        key = self.__key(cell)
+        self.__queued[cell] = key
+        heapq.heappush(self.__heap, (key[0], key[1], cell))
+
+    def __top(self) -> Tuple[float, float, int] | None:
+        """Plus petite entrée à jour de la file (les entrées obsolètes sont retirées au passage)."""
+        while self.__heap:
+            k1, k2, cell = self.__heap[0]
+            if self.__queued.get(cell) == (k1, k2):
+                return self.__heap[0]
+            heapq.heappop(self.__heap)
+        return None
+
+    def __arc(self, u: int, v: int) -> float:
+        """Coût pour aller de u dans la case voisine v (inf si v est interdite)."""
+        if self.__blocked[v]:
+            return float("inf")
+        return self.__base[v] + abs(self.__alt[v] - self.__alt[u]) * 0.5
+
+    def __update(self, cell: int) -> None:
+        if cell != self.__goal:
+            g = self.__g
+            self.__rhs[cell] = min((self.__arc(cell, n) + g[n] for n in self.__neighbours[cell]),
+                                   default=float("inf"))
+        self.__queued.pop(cell, None)
+        if self.__g[cell] != self.__rhs[cell]:
+            self.__push(cell)
+
+    def __compute(self) -> None:
+        g, rhs, start = self.__g, self.__rhs, self.__start
+        expanded = 0
+        while True:
+            top = self.__top()
+            if top is None:
+                break
+            if (top[0], top[1]) >= self.__key(start) and rhs[start] == g[start]:
+                break
+            k_old, u = (top[0], top[1]), top[2]
+            k_new = self.__key(u)
+            if k_old < k_new:
+                self.__push(u)
+                continue
+            heapq.heappop(self.__heap)
+            del self.__queued[u]
+            expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+                for p in self.__neighbours[u]:
+                    self.__update(p)
+            else:
+                g[u] = float("inf")
+                self.__update(u)
+                for p in self.__neighbours[u]:
+                    self.__update(p)
+        self.__expanded = expanded
+
+    def set_start(self, start: Coords) -> None:
+        """Déplace le départ (par exemple le long du chemin déjà parcouru) en gardant l'état de la recherche."""
+        new_start = self.__grid.cell_id(*start)
+        self.__km += self.__heuristic(new_start)
+        self.__start = new_start
+        self.__heuristic = self.__grid._hex_heuristic(start, self.__min_cost)
+
+    def replan(self, cells: List[Coords] | None = None) -> List[Coords]:
+        """
+        Met à jour l'itinéraire après des modifications de la carte (terrain, altitude, rivières) et le retourne.
+        :param cells: cases modifiées depuis la dernière planification ; seuls leurs coûts sont relus dans la grille.
+        Sans `cells`, une carte modifiée entraîne une planification complète (on ne sait pas ce qui a changé).
+        """
+        grid = self.__grid
+        if cells is not None:
+            ids = np.array([grid.cell_id(x, y) for x, y in cells], dtype=np.int64)
+            base, alt, blocked = (values.tolist() for values in grid._routing_values(ids))
+            #Les arcs qui changent sont ceux qui entrent dans une case modifiée ou en sortent
+            dirty = set()
+            for cell, b, a, k in zip(ids.tolist(), base, alt, blocked):
+                if (b, a, k) != (self.__base[cell], self.__alt[cell], self.__blocked[cell]):
+                    self.__base[cell], self.__alt[cell], self.__blocked[cell] = b, a, k
+                    dirty.add(cell)
+                    dirty.update(self.__neighbours[cell])
+            for cell in dirty:
+                self.__update(cell)
+            self.__compute()
+            self.__version = grid.get_map_version()
+        elif grid.get_map_version() != self.__version:
+            self.__reset()
+        else:
+            self.__expanded = 0
+        return self.get_path()
+
+    def get_path(self) -> List[Coords]:
+        """Chemin courant du départ à l'arrivée, liste vide si l'arrivée est inaccessible."""
+        g, cell = self.__g, self.__start
+        if g[cell] == float("inf"):
+            return []
+        path = [cell]
+        while cell != self.__goal:
+            cell = min(self.__neighbours[cell], key=lambda n: self.__arc(cell, n) + g[n])
+            path.append(cell)
+        return [self.__grid.cell_coords(c) for c in path]
+
+
+
 def main():
     """
     Fonction exemple pour présenter le programme ci-dessus.